@@ -0,0 +1,195 @@
+"""Fire parallel quantity updates at one inventory row and count lost ones.
+
+Every strategy sends ``--requests`` concurrent increments of the same
+``ProductUser`` row through the app and compares the final quantity with
+the number of increments that reported success:
+
+* ``blind``: read the quantity, then ``PATCH`` it to ``quantity + 1``.
+* ``if-match``: the same read-modify-write, conditional on the version
+  read, retried on ``412``.
+* ``delta``: a single ``PATCH`` with ``delta: 1``.
+* ``reserve``: move one unit into ``reserved`` per request.
+
+Run with ``task benchmark_inventory``.
+"""
+
+import argparse
+import asyncio
+from http import HTTPStatus
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import NullPool, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from fastapi_products_api.app import app
+from fastapi_products_api.database import get_session
+from fastapi_products_api.models.enums import ProductType
+from fastapi_products_api.models.product_user import ProductUser
+from fastapi_products_api.models.products import Product
+from fastapi_products_api.models.users import User
+from fastapi_products_api.registry import table_registry
+from fastapi_products_api.security import create_user_access_token
+
+
+async def blind(client: AsyncClient, product_id: int):
+    quantity = (await client.get(f'/inventory/{product_id}')).json()[
+        'quantity'
+    ]
+    response = await client.patch(
+        '/inventory/',
+        json={'product_id': product_id, 'quantity': quantity + 1},
+    )
+
+    return response.status_code == HTTPStatus.OK, 0
+
+
+async def if_match(client: AsyncClient, product_id: int):
+    retries = 0
+
+    while True:
+        read = await client.get(f'/inventory/{product_id}')
+        response = await client.patch(
+            '/inventory/',
+            json={
+                'product_id': product_id,
+                'quantity': read.json()['quantity'] + 1,
+            },
+            headers={'If-Match': read.headers['ETag']},
+        )
+
+        if response.status_code != HTTPStatus.PRECONDITION_FAILED:
+            return response.status_code == HTTPStatus.OK, retries
+
+        retries += 1
+
+
+async def delta(client: AsyncClient, product_id: int):
+    response = await client.patch(
+        '/inventory/', json={'product_id': product_id, 'delta': 1}
+    )
+
+    return response.status_code == HTTPStatus.OK, 0
+
+
+async def reserve(client: AsyncClient, product_id: int):
+    response = await client.post(
+        '/inventory/reservations/reserve', json={'product_id': product_id}
+    )
+
+    return response.status_code == HTTPStatus.OK, 0
+
+
+STRATEGIES = {
+    'blind': blind,
+    'if-match': if_match,
+    'delta': delta,
+    'reserve': reserve,
+}
+
+
+async def setup(engine, requests: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.drop_all)
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        user = User(username='bench', email='bench@mail.com', password='-')
+        product = Product(
+            name='bench', brand='bench', price=1.0, type=ProductType.BOOKS
+        )
+        session.add_all([user, product])
+        await session.flush()
+
+        # Reservations draw from the stock, so it has to cover them all.
+        session.add(
+            ProductUser(
+                user_id=user.id, product_id=product.id, quantity=requests
+            )
+        )
+        await session.commit()
+
+        return create_user_access_token(user), product.id
+
+
+async def final_row(engine):
+    async with AsyncSession(engine) as session:
+        return (
+            await session.execute(
+                select(ProductUser.quantity, ProductUser.reserved)
+            )
+        ).one()
+
+
+async def run_strategy(engine, name: str, requests: int):
+    token, product_id = await setup(engine, requests)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url='http://bench',
+        headers={'Authorization': f'Bearer {token}'},
+    ) as client:
+        started = perf_counter()
+        results = await asyncio.gather(
+            *(STRATEGIES[name](client, product_id) for _ in range(requests))
+        )
+        elapsed = perf_counter() - started
+
+    applied = sum(ok for ok, _ in results)
+    retries = sum(retried for _, retried in results)
+    quantity, reserved = await final_row(engine)
+
+    if name == 'reserve':
+        landed = reserved
+    else:
+        landed = quantity - requests
+
+    print(
+        f'{name:>8}: {requests / elapsed:8.1f} req/s  '
+        f'applied={applied} retries={retries} lost={applied - landed}'
+    )
+
+
+async def run(requests: int, strategies: list[str]):
+    with TemporaryDirectory() as directory:
+        engine = create_async_engine(
+            f'sqlite+aiosqlite:///{Path(directory) / "bench.db"}',
+            connect_args={'timeout': 60},
+            poolclass=NullPool,
+        )
+
+        async def get_session_override():
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                yield session
+
+        app.dependency_overrides[get_session] = get_session_override
+
+        print(f'requests={requests}')
+
+        try:
+            for name in strategies:
+                await run_strategy(engine, name, requests)
+
+        finally:
+            app.dependency_overrides.clear()
+            await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument(
+        '--strategy',
+        action='append',
+        choices=list(STRATEGIES),
+        help='strategy to run, repeatable (default: all)',
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.requests, args.strategy or list(STRATEGIES)))
+
+
+if __name__ == '__main__':
+    main()
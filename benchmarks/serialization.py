@@ -0,0 +1,113 @@
+"""Compare list page serialization paths for ``GET /products``.
+
+The baseline is what a handler returning ORM instances costs: load
+``Product`` entities, validate them into ``ProductsResponse`` with
+``from_attributes`` and dump the result through ``JSONResponse``. The fast
+path selects plain rows and hands them to ``RowSerializer``.
+
+Run with ``task benchmark_serialization``.
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from fastapi_products_api.models.enums import ProductType
+from fastapi_products_api.models.products import Product
+from fastapi_products_api.registry import table_registry
+from fastapi_products_api.routers.products import (
+    PRODUCT_COLUMNS,
+    product_serializer,
+)
+from fastapi_products_api.schemas.products import ProductsResponse
+
+response_field = create_model_field(
+    name='Response_read_products', type_=ProductsResponse, mode='serialization'
+)
+
+
+async def orm_page(session: AsyncSession, limit: int) -> bytes:
+    products = (
+        await session.scalars(
+            select(Product).order_by(Product.id).limit(limit)
+        )
+    ).all()
+
+    content = await serialize_response(
+        field=response_field,
+        response_content={'products': products, 'next_cursor': None},
+        is_coroutine=True,
+    )
+
+    return JSONResponse(content).body
+
+
+async def row_page(session: AsyncSession, limit: int) -> bytes:
+    result = await session.execute(
+        select(*PRODUCT_COLUMNS.values()).order_by(Product.id).limit(limit)
+    )
+
+    return product_serializer.page(result.all(), None).body
+
+
+async def measure(page, session: AsyncSession, limit: int, rounds: int):
+    await page(session, limit)
+
+    started = perf_counter()
+
+    for _ in range(rounds):
+        await page(session, limit)
+        session.expunge_all()
+
+    return (perf_counter() - started) / rounds
+
+
+async def run(limit: int, rounds: int):
+    engine = create_async_engine('sqlite+aiosqlite:///:memory:')
+
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add_all(
+            Product(
+                name=f'Product {index}',
+                brand='Acme',
+                price=index + 0.99,
+                type=ProductType.BOOKS,
+            )
+            for index in range(limit)
+        )
+        await session.commit()
+        session.expunge_all()
+
+        assert await orm_page(session, limit) == await row_page(session, limit)
+
+        orm_time = await measure(orm_page, session, limit, rounds)
+        row_time = await measure(row_page, session, limit, rounds)
+
+    await engine.dispose()
+
+    print(f'limit={limit} rounds={rounds}')
+    print(f'orm + response_model: {orm_time * 1000:.3f} ms/page')
+    print(f'rows + RowSerializer: {row_time * 1000:.3f} ms/page')
+    print(f'speedup: {orm_time / row_time:.2f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.limit, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
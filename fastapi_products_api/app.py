@@ -1,9 +1,41 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 
+from fastapi_products_api.database import engine
+from fastapi_products_api.hashing import password_hasher
+from fastapi_products_api.purge import purge_worker
 from fastapi_products_api.routers import auth, inventory, products, users
 from fastapi_products_api.schemas.message import ResponseMessage
+from fastapi_products_api.settings import Settings
+
+settings = Settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    purge_task = None
+
+    if settings.PURGE_INTERVAL > 0:
+        purge_task = asyncio.create_task(
+            purge_worker(
+                engine, settings.PURGE_INTERVAL, settings.PURGE_BATCH_SIZE
+            )
+        )
+
+    yield
+
+    if purge_task is not None:
+        purge_task.cancel()
+
+        with suppress(asyncio.CancelledError):
+            await purge_task
+
+    password_hasher.shutdown()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(products.router)
 app.include_router(users.router)
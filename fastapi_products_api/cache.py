@@ -0,0 +1,192 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+from time import time
+from typing import Any
+
+
+class PrincipalCache:
+    """LRU cache of authenticated principals keyed by access token.
+
+    Each token entry lives for at most ``ttl`` seconds and never past the
+    token's own ``exp``. Entries are also indexed by username so that every
+    token of a user can be dropped at once when that user changes.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._principals: dict[str, Any] = {}
+        self._tokens: dict[str, set[str]] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, token: str):
+        entry = self._entries.get(token)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        username, expires_at = entry
+
+        if expires_at <= time():
+            self._discard(token)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(token)
+        self.hits += 1
+
+        return self._principals[username]
+
+    def set(self, token: str, username: str, principal, expires_at: float):
+        if self.maxsize <= 0:
+            return
+
+        self._discard(token)
+
+        self._entries[token] = (username, min(time() + self.ttl, expires_at))
+        self._principals[username] = principal
+        self._tokens.setdefault(username, set()).add(token)
+
+        while len(self._entries) > self.maxsize:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate(self, username: str):
+        for token in self._tokens.pop(username, set()):
+            del self._entries[token]
+
+        self._principals.pop(username, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._principals.clear()
+        self._tokens.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self)}
+
+    def _discard(self, token: str):
+        entry = self._entries.pop(token, None)
+
+        if entry is None:
+            return
+
+        username = entry[0]
+        tokens = self._tokens[username]
+        tokens.discard(token)
+
+        if not tokens:
+            del self._tokens[username]
+            self._principals.pop(username, None)
+
+
+class TTLCache:
+    """LRU cache whose entries live for at most ``ttl`` seconds.
+
+    Writers that change the data behind a key call ``invalidate`` so that
+    readers never wait out the full ``ttl`` for their own changes.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable):
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+
+        if expires_at <= time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return value
+
+    def set(self, key: Hashable, value):
+        if self.maxsize <= 0:
+            return
+
+        self._entries.pop(key, None)
+        self._entries[key] = (value, time() + self.ttl)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self)}
+
+
+class TokenRevocations:
+    """Lowest token version still accepted per user id.
+
+    A revocation only has to outlive the tokens issued before it, so each
+    entry is dropped ``ttl`` seconds after it was last raised, ``ttl``
+    being the access token lifetime.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        # Ordered by expiry, since every entry lives for the same ``ttl``.
+        self._entries: OrderedDict[int, tuple[int, float]] = OrderedDict()
+
+    def __len__(self):
+        self._prune()
+
+        return len(self._entries)
+
+    def revoke(self, user_id: int, token_version: int):
+        token_version = max(token_version, self.min_version(user_id))
+
+        self._entries.pop(user_id, None)
+        self._entries[user_id] = (token_version, time() + self.ttl)
+
+    def min_version(self, user_id: int) -> int:
+        self._prune()
+
+        if entry := self._entries.get(user_id):
+            return entry[0]
+
+        return 0
+
+    def clear(self):
+        self._entries.clear()
+
+    def _prune(self):
+        now = time()
+
+        while self._entries:
+            user_id, (_, expires_at) = next(iter(self._entries.items()))
+
+            if expires_at > now:
+                break
+
+            del self._entries[user_id]
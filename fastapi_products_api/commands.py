@@ -0,0 +1,46 @@
+import argparse
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fastapi_products_api.database import engine
+from fastapi_products_api.models.facets import PRODUCT_FACETS_REBUILD
+from fastapi_products_api.purge import purge_deleted
+from fastapi_products_api.settings import Settings
+
+settings = Settings()
+
+
+async def rebuild_product_facets(session: AsyncSession):
+    for statement in PRODUCT_FACETS_REBUILD:
+        await session.execute(text(statement))
+
+
+async def rebuild_facets():
+    async with AsyncSession(engine) as session:
+        await rebuild_product_facets(session)
+        await session.commit()
+
+
+async def purge():
+    async with AsyncSession(engine) as session:
+        await purge_deleted(session, settings.PURGE_BATCH_SIZE)
+
+
+COMMANDS = {
+    'rebuild-facets': rebuild_facets,
+    'purge-deleted': purge,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='fastapi_products_api.commands')
+    parser.add_argument('command', choices=COMMANDS)
+    args = parser.parse_args(argv)
+
+    asyncio.run(COMMANDS[args.command]())
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,116 @@
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+from http import HTTPStatus
+
+from fastapi import HTTPException, Response
+
+from fastapi_products_api.schemas.conditional import ConditionalHeaders
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+
+    return value.astimezone(UTC)
+
+
+def cache_validators(
+    rows, fields, *, last_modified: bool = True
+) -> dict[str, str]:
+    """Build ``ETag`` and ``Last-Modified`` headers for a set of rows.
+
+    The entity tag hashes every field the response is made of, so it is a
+    strong validator even when ``updated_at`` only has one-second resolution.
+    Collections pass ``last_modified=False``: a row that was deleted or left
+    the filter does not move the newest ``updated_at`` of the rows left.
+    """
+    digest = blake2b(digest_size=16)
+
+    for row in rows:
+        digest.update(repr([getattr(row, field) for field in fields]).encode())
+
+    headers = {'ETag': f'"{digest.hexdigest()}"'}
+
+    if last_modified and (timestamps := [row.updated_at for row in rows]):
+        headers['Last-Modified'] = format_datetime(
+            _as_utc(max(timestamps)), usegmt=True
+        )
+
+    return headers
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == '*':
+        return True
+
+    candidates = (tag.strip() for tag in if_none_match.split(','))
+
+    return etag in {tag.removeprefix('W/') for tag in candidates}
+
+
+def _not_modified_since(if_modified_since: str, last_modified: str) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+
+    except (TypeError, ValueError):
+        return False
+
+    return parsedate_to_datetime(last_modified) <= _as_utc(since)
+
+
+def not_modified_response(
+    conditional: ConditionalHeaders, headers: dict[str, str]
+) -> Response | None:
+    """Return a 304 response when the client's copy is still current.
+
+    ``If-None-Match`` takes precedence; ``If-Modified-Since`` is only
+    consulted when no entity tags were sent.
+    """
+    if conditional.if_none_match is not None:
+        not_modified = _etag_matches(
+            conditional.if_none_match, headers['ETag']
+        )
+
+    elif conditional.if_modified_since and 'Last-Modified' in headers:
+        not_modified = _not_modified_since(
+            conditional.if_modified_since, headers['Last-Modified']
+        )
+
+    else:
+        not_modified = False
+
+    if not_modified:
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+    return None
+
+
+def version_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def expected_version(if_match: str | None, version: int | None) -> int | None:
+    """The row version a write is conditional on, if any.
+
+    It comes from an ``If-Match`` entity tag as built by ``version_etag``
+    or from an ``expected_version`` in the body; when both are sent they
+    must agree. ``If-Match: *`` only requires the row to exist.
+    """
+    if if_match is None or if_match.strip() == '*':
+        return version
+
+    tag = if_match.strip()
+
+    if not (tag.startswith('"') and tag.endswith('"') and tag[1:-1].isdigit()):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail='Invalid If-Match'
+        )
+
+    if version is not None and version != int(tag[1:-1]):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='If-Match and expected_version disagree',
+        )
+
+    return int(tag[1:-1])
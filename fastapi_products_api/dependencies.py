@@ -6,8 +6,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from fastapi_products_api.database import get_session
 from fastapi_products_api.models.users import User
-from fastapi_products_api.security import get_current_user
+from fastapi_products_api.security import (
+    Principal,
+    get_current_principal,
+    get_current_user,
+    get_current_writer,
+)
 
 T_Session = Annotated[AsyncSession, Depends(get_session)]
 T_OAuthForm = Annotated[OAuth2PasswordRequestForm, Depends()]
 T_CurrentUser = Annotated[User, Depends(get_current_user)]
+T_CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+T_CurrentWriter = Annotated[Principal, Depends(get_current_writer)]
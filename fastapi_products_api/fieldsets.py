@@ -0,0 +1,48 @@
+from collections.abc import Mapping
+from http import HTTPStatus
+
+from fastapi import HTTPException
+
+
+def parse_fields(raw: str | None, columns: Mapping) -> list[str] | None:
+    """Parse a ``fields=a,b,c`` query value against the allowed columns.
+
+    Returns ``None`` when no fieldset was requested, meaning the full
+    representation.
+    """
+    if raw is None:
+        return None
+
+    fields = list(
+        dict.fromkeys(
+            field.strip() for field in raw.split(',') if field.strip()
+        )
+    )
+
+    if not fields:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail='No fields requested'
+        )
+
+    if unknown := [field for field in fields if field not in columns]:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail=f'Unknown fields: {", ".join(unknown)}',
+        )
+
+    return fields
+
+
+def projection(columns: Mapping, fields: list[str] | None, *required):
+    """Columns to select for ``fields`` plus the ``required`` ones.
+
+    ``required`` holds columns the handler itself needs, such as cursor
+    keys or validator inputs, even when the client did not ask for them.
+    """
+    selected = [columns[field] for field in fields or columns]
+
+    for column in required:
+        if not any(column is candidate for candidate in selected):
+            selected.append(column)
+
+    return selected
@@ -0,0 +1,117 @@
+import asyncio
+import os
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from itertools import chain
+
+from fastapi import HTTPException
+
+from fastapi_products_api.security import get_password_hash, verify_password
+from fastapi_products_api.settings import Settings
+
+settings = Settings()
+
+
+def _hash_passwords(passwords: Sequence[str]) -> list[str]:
+    return [get_password_hash(password) for password in passwords]
+
+
+class PasswordHasher:
+    """Runs Argon2 hashing and verification in a bounded process pool.
+
+    Hashing is CPU bound and would otherwise block the event loop, so every
+    call is shipped to a worker process. At most ``max_pending`` calls may
+    be in flight at once; callers beyond that get a 503 instead of queueing
+    without limit.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None,
+        max_pending: int,
+        timeout: float,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        return self._executor
+
+    async def _run(self, func, *args, timeout: float | None = None):
+        if self._pending >= self.max_pending:
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail='Password hashing service is busy',
+                headers={'Retry-After': '1'},
+            )
+
+        self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._get_executor(), func, *args)
+
+            return await asyncio.wait_for(future, timeout or self.timeout)
+
+        except TimeoutError:
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail='Password hashing timed out',
+            )
+
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def hash_many(self, passwords: Sequence[str]) -> list[str]:
+        """Hash ``passwords`` spread over every worker, keeping their order.
+
+        The passwords are split into one chunk per worker so a large batch
+        takes a handful of pool slots instead of one per password.
+        """
+        if not passwords:
+            return []
+
+        workers = self.max_workers or os.cpu_count() or 1
+        chunk_size = -(-len(passwords) // workers)
+        chunks = [
+            passwords[start : start + chunk_size]
+            for start in range(0, len(passwords), chunk_size)
+        ]
+
+        hashed = await asyncio.gather(
+            *(
+                self._run(
+                    _hash_passwords, chunk, timeout=self.timeout * len(chunk)
+                )
+                for chunk in chunks
+            )
+        )
+
+        return list(chain.from_iterable(hashed))
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(
+            verify_password, plain_password, hashed_password
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_QUEUE_SIZE,
+    timeout=settings.PASSWORD_HASH_TIMEOUT,
+)
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from uuid import uuid4
+
+from fastapi_products_api.schemas.jobs import JobStatus
+from fastapi_products_api.settings import Settings
+
+settings = Settings()
+
+
+class JobRegistry:
+    """In-memory registry of background jobs run by this process.
+
+    Jobs are plain dicts shaped like their response model. Once more than
+    ``maxsize`` jobs are tracked the oldest finished ones are forgotten;
+    jobs still pending or running are always kept.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._jobs: OrderedDict[str, dict] = OrderedDict()
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def create(self, **fields) -> dict:
+        job = {
+            'id': uuid4().hex,
+            'status': JobStatus.PENDING,
+            'result': None,
+            'detail': None,
+            **fields,
+        }
+        self._jobs[job['id']] = job
+        self._evict()
+
+        return job
+
+    def get(self, job_id: str) -> dict | None:
+        return self._jobs.get(job_id)
+
+    async def run(self, job_id: str, func, *args):
+        job = self._jobs[job_id]
+        job['status'] = JobStatus.RUNNING
+
+        try:
+            job['result'] = await func(*args)
+            job['status'] = JobStatus.COMPLETED
+
+        except Exception as exc:
+            job['status'] = JobStatus.FAILED
+            job['detail'] = str(exc) or type(exc).__name__
+
+    def _evict(self):
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job['status'] in {JobStatus.COMPLETED, JobStatus.FAILED}
+        ]
+
+        for job_id in finished[: max(len(self._jobs) - self.maxsize, 0)]:
+            del self._jobs[job_id]
+
+
+job_registry = JobRegistry(maxsize=settings.JOB_REGISTRY_SIZE)
@@ -1,5 +1,15 @@
+from fastapi_products_api.models.facets import ProductFacet
 from fastapi_products_api.models.product_user import ProductUser
 from fastapi_products_api.models.products import Product
+from fastapi_products_api.models.search import products_fts
+from fastapi_products_api.models.tombstones import ProductTombstone
 from fastapi_products_api.models.users import User
 
-__all__ = ['Product', 'User', 'ProductUser']
+__all__ = [
+    'Product',
+    'ProductFacet',
+    'ProductTombstone',
+    'User',
+    'ProductUser',
+    'products_fts',
+]
@@ -0,0 +1,99 @@
+from sqlalchemy import DDL, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from fastapi_products_api.registry import table_registry
+
+PRICE_BUCKET_WIDTH = 50
+
+_PRICE_BUCKET = (
+    f'CAST(CAST({{row}}.price / {PRICE_BUCKET_WIDTH} AS INTEGER) '
+    f'* {PRICE_BUCKET_WIDTH} AS TEXT)'
+)
+
+
+@table_registry.mapped_as_dataclass
+class ProductFacet:
+    __tablename__ = 'product_facets'
+
+    facet: Mapped[str] = mapped_column(primary_key=True)
+    value: Mapped[str] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(default=0)
+
+
+def _increment(row: str) -> str:
+    price_bucket = _PRICE_BUCKET.format(row=row)
+
+    return f"""
+        INSERT INTO product_facets(facet, value, count)
+        VALUES ('type', {row}.type, 1),
+               ('brand', {row}.brand, 1),
+               ('price', {price_bucket}, 1)
+        ON CONFLICT(facet, value) DO UPDATE SET count = count + 1;
+    """
+
+
+def _decrement(row: str) -> str:
+    price_bucket = _PRICE_BUCKET.format(row=row)
+
+    return f"""
+        UPDATE product_facets SET count = count - 1
+        WHERE (facet = 'type' AND value = {row}.type)
+           OR (facet = 'brand' AND value = {row}.brand)
+           OR (facet = 'price' AND value = {price_bucket});
+    """
+
+
+# Facet counts are kept current by triggers, so every write path that
+# touches products (single, bulk, sync and import) updates them. Soft
+# deleted products leave the counts when flagged, not when purged.
+PRODUCT_FACETS_DDL = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS product_facets_ai AFTER INSERT ON products
+    BEGIN {_increment('new')} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS product_facets_ad AFTER DELETE ON products
+    WHEN old.deleted_at IS NULL
+    BEGIN {_decrement('old')} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS product_facets_au
+    AFTER UPDATE OF type, brand, price ON products
+    WHEN old.deleted_at IS NULL AND new.deleted_at IS NULL
+    BEGIN {_decrement('old')} {_increment('new')} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS product_facets_soft_delete
+    AFTER UPDATE OF deleted_at ON products
+    WHEN old.deleted_at IS NULL AND new.deleted_at IS NOT NULL
+    BEGIN {_decrement('old')} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS product_facets_restore
+    AFTER UPDATE OF deleted_at ON products
+    WHEN old.deleted_at IS NOT NULL AND new.deleted_at IS NULL
+    BEGIN {_increment('new')} END
+    """,
+)
+
+PRODUCT_FACETS_REBUILD = (
+    'DELETE FROM product_facets',
+    f"""
+    INSERT INTO product_facets(facet, value, count)
+    SELECT 'type', type, count(*) FROM products
+    WHERE deleted_at IS NULL GROUP BY type
+    UNION ALL
+    SELECT 'brand', brand, count(*) FROM products
+    WHERE deleted_at IS NULL GROUP BY brand
+    UNION ALL
+    SELECT 'price', {_PRICE_BUCKET.format(row='products')}, count(*)
+    FROM products WHERE deleted_at IS NULL GROUP BY 2
+    """,
+)
+
+for statement in PRODUCT_FACETS_DDL:
+    event.listen(
+        table_registry.metadata,
+        'after_create',
+        DDL(statement).execute_if(dialect='sqlite'),
+    )
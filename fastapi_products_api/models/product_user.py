@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import ForeignKey, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from fastapi_products_api.registry import table_registry
@@ -9,6 +9,10 @@ from fastapi_products_api.registry import table_registry
 @table_registry.mapped_as_dataclass
 class ProductUser:
     __tablename__ = 'products_users'
+    __mapper_args__ = {'eager_defaults': True}
+    __table_args__ = (
+        Index('ix_products_users_product_id', 'product_id', 'user_id'),
+    )
 
     user_id: Mapped[int] = mapped_column(
         ForeignKey('users.id'), primary_key=True
@@ -23,3 +27,7 @@ class ProductUser:
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
+    # Units set aside by reservations; no longer part of ``quantity``.
+    reserved: Mapped[int] = mapped_column(init=False, server_default=text('0'))
+    # Bumped by every write so clients can make updates conditional.
+    version: Mapped[int] = mapped_column(init=False, server_default=text('1'))
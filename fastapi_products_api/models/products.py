@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Numeric, func
+from sqlalchemy import Index, Numeric, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from fastapi_products_api.models.enums import ProductType
@@ -10,9 +10,29 @@ from fastapi_products_api.registry import table_registry
 @table_registry.mapped_as_dataclass
 class Product:
     __tablename__ = 'products'
+    __mapper_args__ = {'eager_defaults': True}
+    __table_args__ = (
+        Index('ix_products_type_price', 'type', 'price', 'id'),
+        Index('ix_products_brand_price', 'brand', 'price', 'id'),
+        Index('ix_products_price', 'price', 'id'),
+        Index('ix_products_updated_at', 'updated_at', 'id'),
+        # Names are unique among live products only, so deleting a product
+        # frees its name without waiting for the purge.
+        Index(
+            'ix_products_name',
+            'name',
+            unique=True,
+            sqlite_where=text('deleted_at IS NULL'),
+        ),
+        Index(
+            'ix_products_deleted_at',
+            'deleted_at',
+            sqlite_where=text('deleted_at IS NOT NULL'),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
-    name: Mapped[str] = mapped_column(unique=True, nullable=None)
+    name: Mapped[str] = mapped_column(nullable=None)
     brand: Mapped[str] = mapped_column(nullable=False)
     price: Mapped[float] = mapped_column(Numeric(scale=2), nullable=False)
     type: Mapped[ProductType] = mapped_column(nullable=False)
@@ -22,3 +42,6 @@ class Product:
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
+    deleted_at: Mapped[datetime | None] = mapped_column(
+        init=False, default=None
+    )
@@ -0,0 +1,60 @@
+from sqlalchemy import DDL, Float, Integer, String, column, event, table
+
+from fastapi_products_api.registry import table_registry
+
+# External-content FTS5 index over products.name and products.brand. The
+# index is maintained by triggers, so every write path keeps it in sync.
+products_fts = table(
+    'products_fts',
+    column('rowid', Integer),
+    column('name', String),
+    column('brand', String),
+    column('rank', Float),
+)
+
+PRODUCTS_FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, brand,
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products
+    BEGIN
+        INSERT INTO products_fts(rowid, name, brand)
+        VALUES (new.id, new.name, new.brand);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products
+    BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, brand)
+        VALUES ('delete', old.id, old.name, old.brand);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au
+    AFTER UPDATE OF name, brand ON products
+    BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, brand)
+        VALUES ('delete', old.id, old.name, old.brand);
+        INSERT INTO products_fts(rowid, name, brand)
+        VALUES (new.id, new.name, new.brand);
+    END
+    """,
+)
+
+for statement in PRODUCTS_FTS_DDL:
+    event.listen(
+        table_registry.metadata,
+        'after_create',
+        DDL(statement).execute_if(dialect='sqlite'),
+    )
+
+event.listen(
+    table_registry.metadata,
+    'before_drop',
+    DDL('DROP TABLE IF EXISTS products_fts').execute_if(dialect='sqlite'),
+)
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from sqlalchemy import DDL, Index, event, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from fastapi_products_api.registry import table_registry
+
+
+@table_registry.mapped_as_dataclass
+class ProductTombstone:
+    __tablename__ = 'product_tombstones'
+    __table_args__ = (
+        Index('ix_product_tombstones_deleted_at', 'deleted_at', 'product_id'),
+    )
+
+    product_id: Mapped[int] = mapped_column(primary_key=True)
+    deleted_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=func.now()
+    )
+
+
+# Deletes are recorded by trigger so the change feed sees every write path.
+# A product is tombstoned when it is soft deleted; purging it later keeps
+# that tombstone. SQLite may hand a deleted id to a new product, so an
+# insert, like a restore, clears any tombstone left for the id.
+PRODUCT_TOMBSTONES_DDL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS product_tombstones_ad
+    AFTER DELETE ON products
+    BEGIN
+        INSERT INTO product_tombstones(product_id, deleted_at)
+        VALUES (old.id, CURRENT_TIMESTAMP)
+        ON CONFLICT(product_id) DO NOTHING;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_tombstones_soft_delete
+    AFTER UPDATE OF deleted_at ON products
+    WHEN old.deleted_at IS NULL AND new.deleted_at IS NOT NULL
+    BEGIN
+        INSERT INTO product_tombstones(product_id, deleted_at)
+        VALUES (new.id, CURRENT_TIMESTAMP)
+        ON CONFLICT(product_id) DO UPDATE SET deleted_at = excluded.deleted_at;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_tombstones_restore
+    AFTER UPDATE OF deleted_at ON products
+    WHEN old.deleted_at IS NOT NULL AND new.deleted_at IS NULL
+    BEGIN
+        DELETE FROM product_tombstones WHERE product_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_tombstones_ai
+    AFTER INSERT ON products
+    BEGIN
+        DELETE FROM product_tombstones WHERE product_id = new.id;
+    END
+    """,
+)
+
+for statement in PRODUCT_TOMBSTONES_DDL:
+    event.listen(
+        table_registry.metadata,
+        'after_create',
+        DDL(statement).execute_if(dialect='sqlite'),
+    )
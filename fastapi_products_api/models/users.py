@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import func
+from sqlalchemy import Computed, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from fastapi_products_api.registry import table_registry
@@ -9,15 +9,64 @@ from fastapi_products_api.registry import table_registry
 @table_registry.mapped_as_dataclass
 class User:
     __tablename__ = 'users'
+    __mapper_args__ = {'eager_defaults': True}
+    __table_args__ = (
+        # Usernames and emails are unique among live accounts only, so
+        # deleting an account frees them without waiting for the purge.
+        Index(
+            'ix_users_username',
+            'username',
+            unique=True,
+            sqlite_where=text('deleted_at IS NULL'),
+        ),
+        Index(
+            'ix_users_email',
+            'email',
+            unique=True,
+            sqlite_where=text('deleted_at IS NULL'),
+        ),
+        # Case variants of a live account's username or email are taken.
+        Index(
+            'ix_users_username_normalized',
+            'username_normalized',
+            unique=True,
+            sqlite_where=text('deleted_at IS NULL'),
+        ),
+        Index(
+            'ix_users_email_normalized',
+            'email_normalized',
+            unique=True,
+            sqlite_where=text('deleted_at IS NULL'),
+        ),
+        Index(
+            'ix_users_deleted_at',
+            'deleted_at',
+            sqlite_where=text('deleted_at IS NOT NULL'),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
-    username: Mapped[str] = mapped_column(unique=True, nullable=False)
-    email: Mapped[str] = mapped_column(unique=True, nullable=False)
+    username: Mapped[str] = mapped_column(nullable=False)
+    email: Mapped[str] = mapped_column(nullable=False)
     password: Mapped[str] = mapped_column(nullable=False)
     is_superuser: Mapped[bool] = mapped_column(default=False)
+    token_version: Mapped[int] = mapped_column(
+        init=False, default=0, server_default='0'
+    )
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
+    deleted_at: Mapped[datetime | None] = mapped_column(
+        init=False, default=None
+    )
+    # Lower-cased copies maintained by the database, used for
+    # case-insensitive login and prefix range scans.
+    username_normalized: Mapped[str] = mapped_column(
+        Computed('lower(username)'), init=False
+    )
+    email_normalized: Mapped[str] = mapped_column(
+        Computed('lower(email)'), init=False
+    )
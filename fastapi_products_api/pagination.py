@@ -0,0 +1,118 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from http import HTTPStatus
+
+from fastapi import HTTPException
+from pydantic_core import to_jsonable_python
+from sqlalchemy import tuple_
+
+
+def _signature(columns, descending: bool):
+    prefix = '-' if descending else ''
+
+    return ','.join(f'{prefix}{column.key}' for column in columns)
+
+
+def _load_value(column, raw):
+    if raw is None:
+        return None
+
+    python_type = column.type.python_type
+
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+
+    return python_type(raw)
+
+
+def _row_value(row, key: str):
+    if isinstance(row, Mapping):
+        return row[key]
+
+    return getattr(row, key)
+
+
+def encode_cursor(signature: str, values: Sequence) -> str:
+    payload = json.dumps(
+        {'k': signature, 'v': to_jsonable_python(list(values))},
+        separators=(',', ':'),
+    )
+
+    return urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(signature: str, cursor: str) -> list:
+    invalid_cursor = HTTPException(
+        status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor'
+    )
+
+    try:
+        payload = json.loads(
+            urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        )
+
+    except (binascii.Error, ValueError):
+        raise invalid_cursor
+
+    if not isinstance(payload, dict) or payload.get('k') != signature:
+        raise invalid_cursor
+
+    return payload.get('v') or []
+
+
+def paginate(stmt, columns, page, descending: bool = False):
+    """Order ``stmt`` by ``columns`` and restrict it to one page.
+
+    ``page`` is any filter with ``cursor``, ``offset`` and ``limit``. When a
+    cursor is given the statement seeks past the row it encodes, otherwise
+    it falls back to the plain offset form.
+    """
+    stmt = stmt.order_by(
+        *(column.desc() if descending else column for column in columns)
+    )
+
+    if page.cursor:
+        raw_values = decode_cursor(
+            _signature(columns, descending), page.cursor
+        )
+
+        if len(raw_values) != len(columns):
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor'
+            )
+
+        try:
+            values = [
+                _load_value(column, raw)
+                for column, raw in zip(columns, raw_values)
+            ]
+
+        except (TypeError, ValueError, ArithmeticError):
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor'
+            )
+
+        keys = tuple_(*columns)
+        stmt = stmt.where(
+            keys < tuple_(*values) if descending else keys > tuple_(*values)
+        )
+
+    else:
+        stmt = stmt.offset(page.offset)
+
+    return stmt.limit(page.limit)
+
+
+def next_cursor(rows, columns, page, descending: bool = False):
+    if not rows or len(rows) < page.limit:
+        return None
+
+    last_row = rows[-1]
+
+    return encode_cursor(
+        _signature(columns, descending),
+        [_row_value(last_row, column.key) for column in columns],
+    )
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fastapi_products_api.models.product_user import ProductUser
+from fastapi_products_api.models.products import Product
+from fastapi_products_api.models.users import User
+
+logger = logging.getLogger(__name__)
+
+PURGE_TARGETS = (
+    ('products', Product, ProductUser.product_id),
+    ('users', User, ProductUser.user_id),
+)
+
+
+async def _delete_in_batches(session: AsyncSession, stmt, batch_size: int):
+    deleted = 0
+
+    while True:
+        result = await session.execute(stmt)
+        await session.commit()
+        deleted += result.rowcount
+
+        if result.rowcount < batch_size:
+            return deleted
+
+
+async def purge_deleted(session: AsyncSession, batch_size: int):
+    """Remove soft deleted products and users along with their inventory.
+
+    Every statement deletes at most ``batch_size`` rows and is committed on
+    its own, so the write lock is only ever held briefly. Inventory rows
+    go first, then the parents that no longer have any.
+    """
+    purged = {'inventory': 0}
+
+    for name, model, foreign_key in PURGE_TARGETS:
+        deleted_ids = select(model.id).where(model.deleted_at.is_not(None))
+
+        purged['inventory'] += await _delete_in_batches(
+            session,
+            delete(ProductUser).where(
+                tuple_(ProductUser.user_id, ProductUser.product_id).in_(
+                    select(ProductUser.user_id, ProductUser.product_id)
+                    .where(foreign_key.in_(deleted_ids))
+                    .limit(batch_size)
+                )
+            ),
+            batch_size,
+        )
+
+        purged[name] = await _delete_in_batches(
+            session,
+            delete(model).where(
+                model.id.in_(
+                    deleted_ids.where(
+                        ~select(ProductUser)
+                        .where(foreign_key == model.id)
+                        .exists()
+                    ).limit(batch_size)
+                )
+            ),
+            batch_size,
+        )
+
+    return purged
+
+
+async def purge_worker(engine, interval: float, batch_size: int):
+    while True:
+        await asyncio.sleep(interval)
+
+        try:
+            async with AsyncSession(engine) as session:
+                await purge_deleted(session, batch_size)
+
+        except Exception:
+            logger.exception('Purging soft deleted rows failed')
@@ -1,21 +1,27 @@
 from http import HTTPStatus
 
 from fastapi import APIRouter, HTTPException
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 from fastapi_products_api.dependencies import T_OAuthForm, T_Session
+from fastapi_products_api.hashing import password_hasher
 from fastapi_products_api.models.users import User
 from fastapi_products_api.schemas.auth import Token
-from fastapi_products_api.security import create_access_token, verify_password
+from fastapi_products_api.security import create_user_access_token
 
 router = APIRouter(prefix='/auth', tags=['auth'])
 
 
 @router.post('/token', response_model=Token)
 async def login_for_access_token(form_data: T_OAuthForm, session: T_Session):
-    db_user = await session.scalar(
-        select(User).where(User.username == form_data.username)
+    # Usernames match case-insensitively through the normalized index.
+    result = await session.execute(
+        select(User).where(
+            User.username_normalized == func.lower(form_data.username),
+            User.deleted_at.is_(None),
+        )
     )
+    db_user = result.scalar_one_or_none()
 
     if not db_user:
         raise HTTPException(
@@ -23,12 +29,12 @@ async def login_for_access_token(form_data: T_OAuthForm, session: T_Session):
             detail='Incorrect username or password',
         )
 
-    if not verify_password(form_data.password, db_user.password):
+    if not await password_hasher.verify(form_data.password, db_user.password):
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
             detail='Incorrect username or password',
         )
 
-    access_token = create_access_token(data={'sub': db_user.username})
+    access_token = create_user_access_token(db_user)
 
     return {'access_token': access_token}
@@ -1,24 +1,186 @@
+from collections import defaultdict
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy import select, update
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from sqlalchemy import and_, case, func, literal, select, update
+from sqlalchemy.dialects.sqlite import insert
 
-from fastapi_products_api.dependencies import T_CurrentUser, T_Session
+from fastapi_products_api.cache import TTLCache
+from fastapi_products_api.conditional import expected_version, version_etag
+from fastapi_products_api.dependencies import (
+    T_CurrentPrincipal,
+    T_CurrentWriter,
+    T_Session,
+)
+from fastapi_products_api.fieldsets import parse_fields, projection
 from fastapi_products_api.models.product_user import ProductUser
 from fastapi_products_api.models.products import Product
+from fastapi_products_api.pagination import next_cursor, paginate
+from fastapi_products_api.schemas.conditional import WritePreconditions
+from fastapi_products_api.schemas.fieldsets import Fieldset
 from fastapi_products_api.schemas.inventory import (
+    FilterInventorySummary,
     FilterUserInventory,
+    InventoryOperationKind,
+    ReservationAction,
     ResponseUserInventoryAddProduct,
+    ResponseUserInventoryBatch,
     ResponseUserInventoryReadList,
     ResponseUserInventoryReadProduct,
+    ResponseUserInventoryReservation,
+    ResponseUserInventorySummary,
     ResponseUserInventoryUpdateProductQuantity,
     UserInventoryAddProduct,
+    UserInventoryBatch,
+    UserInventoryReservation,
     UserInventoryUpdateProduct,
 )
+from fastapi_products_api.serialization import RowSerializer
+from fastapi_products_api.settings import Settings
+
+settings = Settings()
 
 router = APIRouter(prefix='/inventory', tags=['inventory'])
 
+INVENTORY_COLUMNS = {
+    'product_id': ProductUser.product_id,
+    'name': Product.name,
+    'brand': Product.brand,
+    'price': Product.price,
+    'type': Product.type,
+    'quantity': ProductUser.quantity,
+}
+
+inventory_serializer = RowSerializer(
+    ResponseUserInventoryReadProduct, key='products'
+)
+
+reservation_serializer = RowSerializer(ResponseUserInventoryReservation)
+
+# How each reservation action shifts (quantity, reserved) per unit.
+RESERVATION_MOVES = {
+    ReservationAction.RESERVE: (-1, 1),
+    ReservationAction.RELEASE: (1, -1),
+    ReservationAction.CONSUME: (0, -1),
+}
+
+# Summaries per user id, dropped by every inventory write of that user.
+# Product edits are not tracked, so their effect shows up within the ttl.
+summary_cache = TTLCache(
+    maxsize=settings.INVENTORY_SUMMARY_CACHE_SIZE,
+    ttl=settings.INVENTORY_SUMMARY_CACHE_TTL,
+)
+
+
+def _returning_product_columns():
+    # RETURNING may only name the table being written, so the product
+    # fields are read through correlated primary key lookups instead.
+    return [
+        select(getattr(Product, field))
+        .where(Product.id == ProductUser.product_id)
+        .scalar_subquery()
+        .label(field)
+        for field in ('name', 'brand', 'price', 'type')
+    ]
+
+
+def _held(user_id: int, product_id: int):
+    return and_(
+        ProductUser.user_id == user_id,
+        ProductUser.product_id == product_id,
+        select(Product.id)
+        .where(
+            Product.id == ProductUser.product_id,
+            Product.deleted_at.is_(None),
+        )
+        .exists(),
+    )
+
+
+def _version_guard(version: int | None):
+    if version is None:
+        return ()
+
+    return (ProductUser.version == version,)
+
+
+async def _raise_write_failure(
+    session, held, version: int | None, conflict: str
+):
+    """Explain why a conditional inventory write matched no row."""
+    current_version = await session.scalar(
+        select(ProductUser.version).where(held)
+    )
+
+    if current_version is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='Product not found'
+        )
+
+    if version is not None and current_version != version:
+        raise HTTPException(
+            status_code=HTTPStatus.PRECONDITION_FAILED,
+            detail='Inventory version mismatch',
+            headers={'ETag': version_etag(current_version)},
+        )
+
+    raise HTTPException(status_code=HTTPStatus.CONFLICT, detail=conflict)
+
+
+def _format_ids(ids) -> str:
+    return ', '.join(str(product_id) for product_id in ids)
+
+
+async def _held_quantities(session, user_id: int, ids: list[int]):
+    """Map every live product in ``ids`` to the quantity ``user_id`` holds.
+
+    Products the user does not hold yet map to ``None``; ids with no live
+    product are left out.
+    """
+    result = await session.execute(
+        select(Product.id, ProductUser.quantity)
+        .outerjoin(
+            ProductUser,
+            and_(
+                ProductUser.product_id == Product.id,
+                ProductUser.user_id == user_id,
+            ),
+        )
+        .where(Product.id.in_(ids), Product.deleted_at.is_(None))
+    )
+
+    return dict(result.all())
+
+
+def _on_conflict_update_quantity(stmt, accumulate: bool):
+    quantity = stmt.excluded.quantity
+
+    if accumulate:
+        quantity = ProductUser.quantity + quantity
+
+    return stmt.on_conflict_do_update(
+        index_elements=[ProductUser.user_id, ProductUser.product_id],
+        set_={
+            'quantity': quantity,
+            'version': ProductUser.version + 1,
+            'updated_at': func.now(),
+        },
+    )
+
+
+def _upsert_inventory(user_id: int, operations, accumulate: bool):
+    stmt = insert(ProductUser).values([
+        {
+            'user_id': user_id,
+            'product_id': operation.product_id,
+            'quantity': operation.quantity,
+        }
+        for operation in operations
+    ])
+
+    return _on_conflict_update_quantity(stmt, accumulate)
+
 
 @router.post(
     '/',
@@ -27,53 +189,253 @@ router = APIRouter(prefix='/inventory', tags=['inventory'])
 )
 async def add_product_to_user_inventory(
     inventory: UserInventoryAddProduct,
-    current_user: T_CurrentUser,
+    response: Response,
+    current_user: T_CurrentWriter,
     session: T_Session,
 ):
-    db_product = await session.scalar(
-        select(Product).where(Product.id == inventory.product_id)
+    """Add ``product_id`` to the inventory, or add to the held quantity.
+
+    The product lookup, insert and increment are one statement, so
+    concurrent adds of the same product all land.
+    """
+    live_product = select(
+        literal(current_user.id), Product.id, literal(inventory.quantity)
+    ).where(Product.id == inventory.product_id, Product.deleted_at.is_(None))
+
+    stmt = _on_conflict_update_quantity(
+        insert(ProductUser).from_select(
+            ['user_id', 'product_id', 'quantity'], live_product
+        ),
+        accumulate=True,
+    ).returning(
+        ProductUser.product_id,
+        ProductUser.quantity,
+        ProductUser.version,
+        ProductUser.created_at,
+        ProductUser.updated_at,
     )
 
-    if not db_product:
+    inventory_data = (await session.execute(stmt)).mappings().first()
+    await session.commit()
+    summary_cache.invalidate(current_user.id)
+
+    if not inventory_data:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='Product not found'
         )
 
-    new_inventory = ProductUser(
-        user_id=current_user.id,
-        product_id=inventory.product_id,
-        quantity=inventory.quantity,
-    )
+    response.headers['ETag'] = version_etag(inventory_data['version'])
+
+    return inventory_data
+
+
+@router.post('/batch', response_model=ResponseUserInventoryBatch)
+async def apply_inventory_batch(
+    batch: UserInventoryBatch,
+    current_user: T_CurrentWriter,
+    session: T_Session,
+):
+    """Apply add/set/delta operations to the inventory in one transaction.
+
+    ``add`` inserts the product or increases its quantity, ``set``
+    inserts or overwrites it, and ``delta`` shifts a held quantity by a
+    signed amount. Each kind is written with one multi-row statement and
+    nothing is kept unless every operation applies.
+    """
+    operations = batch.operations
+
+    if len(operations) > settings.INVENTORY_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            detail=(
+                f'At most {settings.INVENTORY_BATCH_MAX_ITEMS} operations '
+                'per request'
+            ),
+        )
+
+    ids = [operation.product_id for operation in operations]
+
+    if len(set(ids)) != len(ids):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Each product may appear once per batch',
+        )
+
+    by_kind = defaultdict(list)
+
+    for operation in operations:
+        by_kind[operation.op].append(operation)
+
+    adds = by_kind[InventoryOperationKind.ADD]
+    sets = by_kind[InventoryOperationKind.SET]
+    deltas = by_kind[InventoryOperationKind.DELTA]
+
+    if any(operation.quantity <= 0 for operation in adds):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Quantity to add must be positive',
+        )
+
+    if any(operation.quantity < 0 for operation in sets):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Quantity must not be negative',
+        )
+
+    held = await _held_quantities(session, current_user.id, ids)
+
+    if missing := [product_id for product_id in ids if product_id not in held]:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=f'Products not found: {_format_ids(missing)}',
+        )
+
+    if not_held := [
+        operation.product_id
+        for operation in deltas
+        if held[operation.product_id] is None
+    ]:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=f'Products not in inventory: {_format_ids(not_held)}',
+        )
+
+    if adds:
+        await session.execute(
+            _upsert_inventory(current_user.id, adds, accumulate=True)
+        )
 
-    session.add(new_inventory)
+    if sets:
+        await session.execute(
+            _upsert_inventory(current_user.id, sets, accumulate=False)
+        )
+
+    if deltas:
+        # The floor is checked in the statement itself, so a concurrent
+        # writer cannot push a quantity below zero between read and write.
+        shifted = ProductUser.quantity + case(
+            {operation.product_id: operation.quantity for operation in deltas},
+            value=ProductUser.product_id,
+        )
+
+        result = await session.execute(
+            update(ProductUser)
+            .where(
+                ProductUser.user_id == current_user.id,
+                ProductUser.product_id.in_(
+                    operation.product_id for operation in deltas
+                ),
+                shifted >= 0,
+            )
+            .values(quantity=shifted, version=ProductUser.version + 1)
+            .returning(ProductUser.product_id)
+        )
+        applied = set(result.scalars())
+
+        if len(applied) != len(deltas):
+            await session.rollback()
+
+            raise HTTPException(
+                status_code=HTTPStatus.CONFLICT,
+                detail='Insufficient quantity for products: '
+                + _format_ids(
+                    operation.product_id
+                    for operation in deltas
+                    if operation.product_id not in applied
+                ),
+            )
+
+    result = await session.execute(
+        select(*INVENTORY_COLUMNS.values())
+        .join_from(ProductUser, Product)
+        .where(
+            ProductUser.user_id == current_user.id,
+            ProductUser.product_id.in_(ids),
+        )
+    )
+    rows = {row['product_id']: row for row in result.mappings()}
     await session.commit()
-    await session.refresh(new_inventory)
+    summary_cache.invalidate(current_user.id)
+
+    return {'products': [rows[product_id] for product_id in ids]}
+
+
+async def _inventory_summary(session, user_id: int):
+    result = await session.execute(
+        select(
+            Product.type,
+            func.count(),
+            func.sum(ProductUser.quantity),
+            func.sum(Product.price * ProductUser.quantity),
+        )
+        .join_from(ProductUser, Product)
+        .where(ProductUser.user_id == user_id, Product.deleted_at.is_(None))
+        .group_by(Product.type)
+        .order_by(Product.type)
+    )
 
-    return new_inventory
+    types = [
+        {'type': type_, 'products': products, 'items': items, 'value': value}
+        for type_, products, items, value in result
+    ]
+
+    return {
+        'products': sum(entry['products'] for entry in types),
+        'items': sum(entry['items'] for entry in types),
+        'value': sum(entry['value'] for entry in types),
+        'types': types,
+    }
+
+
+@router.get('/summary', response_model=ResponseUserInventorySummary)
+async def read_inventory_summary(
+    filter_summary: Annotated[FilterInventorySummary, Query()],
+    current_user: T_CurrentPrincipal,
+    session: T_Session,
+):
+    """Total products, items and value held, overall and per product type.
+
+    Computed with one grouped aggregate over the inventory join. With
+    ``cached`` a recent summary may be served instead; it is dropped on
+    every inventory write of the user and otherwise kept for
+    ``INVENTORY_SUMMARY_CACHE_TTL`` seconds.
+    """
+    if filter_summary.cached and (
+        summary := summary_cache.get(current_user.id)
+    ):
+        return summary
+
+    summary = await _inventory_summary(session, current_user.id)
+    summary_cache.set(current_user.id, summary)
+
+    return summary
 
 
 @router.get('/{product_id}', response_model=ResponseUserInventoryReadProduct)
 async def read_product_inventory_by_product_id(
-    product_id: int, current_user: T_CurrentUser, session: T_Session
+    product_id: int,
+    fieldset: Annotated[Fieldset, Query()],
+    current_user: T_CurrentPrincipal,
+    session: T_Session,
 ):
+    fields = parse_fields(fieldset.fields, INVENTORY_COLUMNS)
+
     stmt = (
-        select(
-            ProductUser.quantity,
-            ProductUser.product_id,
-            Product.name,
-            Product.brand,
-            Product.price,
-            Product.type,
-        )
+        select(*projection(INVENTORY_COLUMNS, fields, ProductUser.version))
         .join_from(ProductUser, Product)
         .where(
             ProductUser.user_id == current_user.id,
             ProductUser.product_id == product_id,
+            Product.deleted_at.is_(None),
         )
     )
 
-    if inventory_data := (await session.execute(stmt)).mappings().first():
-        return inventory_data
+    if inventory_data := (await session.execute(stmt)).first():
+        return inventory_serializer.item(
+            inventory_data,
+            fields,
+            {'ETag': version_etag(inventory_data.version)},
+        )
 
     raise HTTPException(status_code=404, detail='Product not found')
 
@@ -81,73 +443,142 @@ async def read_product_inventory_by_product_id(
 @router.get('/', response_model=ResponseUserInventoryReadList)
 async def read_product_inventory_list(
     filter_products: Annotated[FilterUserInventory, Query()],
-    current_user: T_CurrentUser,
+    current_user: T_CurrentPrincipal,
     session: T_Session,
 ):
+    fields = parse_fields(filter_products.fields, INVENTORY_COLUMNS)
+    page_keys = [ProductUser.product_id]
+
     stmt = (
-        select(
-            ProductUser.quantity,
-            Product.id.label('product_id'),
-            Product.name,
-            Product.brand,
-            Product.price,
-            Product.type,
-        )
+        select(*projection(INVENTORY_COLUMNS, fields, *page_keys))
         .join_from(ProductUser, Product)
-        .where(ProductUser.user_id == current_user.id)
-        .offset(filter_products.offset)
-        .limit(filter_products.limit)
+        .where(
+            ProductUser.user_id == current_user.id,
+            Product.deleted_at.is_(None),
+        )
     )
 
-    result = await session.execute(stmt)
-    products_data = result.mappings().all()
+    result = await session.execute(paginate(stmt, page_keys, filter_products))
+    products_data = result.all()
 
-    return {'products': products_data}
+    return inventory_serializer.page(
+        products_data,
+        next_cursor(products_data, page_keys, filter_products),
+        fields,
+    )
 
 
 @router.patch('/', response_model=ResponseUserInventoryUpdateProductQuantity)
 async def update_product_inventory_quantity(
     inventory: UserInventoryUpdateProduct,
-    current_user: T_CurrentUser,
+    preconditions: Annotated[WritePreconditions, Header()],
+    response: Response,
+    current_user: T_CurrentWriter,
     session: T_Session,
 ):
-    stmt_update = (
-        update(ProductUser)
-        .where(
-            ProductUser.user_id == current_user.id,
-            ProductUser.product_id == inventory.product_id,
-        )
-        .values(quantity=inventory.quantity)
-    )
+    """Set the held quantity, or shift it by a signed ``delta``.
 
-    result_update = await session.execute(stmt_update)
+    A delta is applied inside the statement and never takes the quantity
+    below zero, so concurrent shifts of the same row are not lost. An
+    ``If-Match`` header or ``expected_version`` makes the write fail with
+    412 when the row changed since the client read it.
+    """
+    match inventory.quantity, inventory.delta:
+        case int() as quantity, None:
+            guards = ()
 
-    if result_update.rowcount == 0:
-        raise HTTPException(status_code=404, detail='Product not found')
+        case None, int() as delta:
+            quantity = ProductUser.quantity + delta
+            guards = (quantity >= 0,)
 
-    # 2. Busca os dados atualizados com JOIN
-    stmt_select = (
-        select(
+        case _:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail='Provide either quantity or delta',
+            )
+
+    version = expected_version(
+        preconditions.if_match, inventory.expected_version
+    )
+    held = _held(current_user.id, inventory.product_id)
+
+    stmt = (
+        update(ProductUser)
+        .where(held, *guards, *_version_guard(version))
+        .values(quantity=quantity, version=ProductUser.version + 1)
+        .returning(
             ProductUser.quantity,
+            ProductUser.version,
             ProductUser.product_id,
-            Product.name,
-            Product.brand,
-            Product.price,
-            Product.type,
+            *_returning_product_columns(),
         )
-        .join_from(ProductUser, Product)
-        .where(
-            ProductUser.user_id == current_user.id,
-            ProductUser.product_id == inventory.product_id,
+    )
+
+    result = await session.execute(stmt)
+    inventory_data = result.mappings().first()
+    await session.commit()
+    summary_cache.invalidate(current_user.id)
+
+    if not inventory_data:
+        await _raise_write_failure(
+            session, held, version, 'Insufficient quantity'
         )
+
+    response.headers['ETag'] = version_etag(inventory_data['version'])
+
+    return inventory_data
+
+
+@router.post(
+    '/reservations/{action}',
+    response_model=ResponseUserInventoryReservation,
+)
+async def move_reserved_quantity(
+    action: ReservationAction,
+    reservation: UserInventoryReservation,
+    preconditions: Annotated[WritePreconditions, Header()],
+    current_user: T_CurrentWriter,
+    session: T_Session,
+):
+    """Reserve, release or consume units of a held product.
+
+    ``reserve`` moves units from the held quantity into ``reserved``,
+    ``release`` moves them back and ``consume`` drops reserved units. Each
+    move is one conditional UPDATE, so neither column drops below zero
+    however many clients race on the row.
+    """
+    version = expected_version(
+        preconditions.if_match, reservation.expected_version
     )
+    quantity_sign, reserved_sign = RESERVATION_MOVES[action]
+    quantity = ProductUser.quantity + quantity_sign * reservation.quantity
+    reserved = ProductUser.reserved + reserved_sign * reservation.quantity
+    held = _held(current_user.id, reservation.product_id)
 
-    result = await session.execute(stmt_select)
+    result = await session.execute(
+        update(ProductUser)
+        .where(held, quantity >= 0, reserved >= 0, *_version_guard(version))
+        .values(
+            quantity=quantity,
+            reserved=reserved,
+            version=ProductUser.version + 1,
+        )
+        .returning(
+            ProductUser.product_id,
+            ProductUser.quantity,
+            ProductUser.reserved,
+            ProductUser.version,
+        )
+    )
+    inventory_data = result.first()
     await session.commit()
+    summary_cache.invalidate(current_user.id)
 
-    if inventory_data := result.mappings().first():
-        return inventory_data
+    if not inventory_data:
+        await _raise_write_failure(
+            session, held, version, f'Insufficient quantity to {action}'
+        )
 
-    raise HTTPException(
-        status_code=500, detail='Update succeeded but failed to retrieve data'
+    return reservation_serializer.item(
+        inventory_data, headers={'ETag': version_etag(inventory_data.version)}
     )
@@ -1,23 +1,400 @@
+import csv
+import io
+import json
+import re
 from http import HTTPStatus
+from itertools import islice
+from tempfile import SpooledTemporaryFile
 from typing import Annotated
 
-from fastapi import HTTPException, Query
+from fastapi import Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from fastapi.routing import APIRouter
-from sqlalchemy import select
+from pydantic import ValidationError
+from sqlalchemy import (
+    String,
+    false,
+    func,
+    literal,
+    literal_column,
+    null,
+    or_,
+    select,
+    true,
+    tuple_,
+    type_coerce,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from fastapi_products_api.conditional import (
+    cache_validators,
+    not_modified_response,
+)
 from fastapi_products_api.dependencies import T_Session
+from fastapi_products_api.fieldsets import parse_fields, projection
+from fastapi_products_api.models.enums import ProductType
+from fastapi_products_api.models.facets import PRICE_BUCKET_WIDTH, ProductFacet
+from fastapi_products_api.models.product_user import ProductUser
 from fastapi_products_api.models.products import Product
+from fastapi_products_api.models.search import products_fts
+from fastapi_products_api.models.tombstones import ProductTombstone
+from fastapi_products_api.models.users import User
+from fastapi_products_api.pagination import (
+    decode_cursor,
+    encode_cursor,
+    next_cursor,
+    paginate,
+)
+from fastapi_products_api.schemas.conditional import ConditionalHeaders
+from fastapi_products_api.schemas.fieldsets import Fieldset
 from fastapi_products_api.schemas.products import (
+    CatalogFormat,
+    FilterChanges,
+    FilterExport,
+    FilterImport,
     FilterPage,
+    FilterProductIds,
+    FilterProducts,
+    FilterSearch,
+    ProductBulkStatus,
+    ProductChangesResponse,
     ProductCreate,
+    ProductFacetsResponse,
+    ProductHolder,
+    ProductHoldersCount,
+    ProductHoldersResponse,
+    ProductIds,
     ProductResponse,
+    ProductsBatchResponse,
+    ProductsBulkResponse,
+    ProductSort,
     ProductsResponse,
+    ProductsSyncResponse,
     ProductUpdate,
 )
+from fastapi_products_api.serialization import RowSerializer
+from fastapi_products_api.settings import Settings
+
+settings = Settings()
 
 router = APIRouter(prefix='/products', tags=['products'])
 
+PRODUCT_COLUMNS = {
+    field: getattr(Product, field) for field in ProductResponse.model_fields
+}
+
+product_serializer = RowSerializer(ProductResponse, key='products')
+
+holder_serializer = RowSerializer(ProductHolder, key='holders')
+
+CHANGES_SIGNATURE = 'changed_at,id'
+
+EXPORT_FIELDS = ('id', 'name', 'brand', 'price', 'type')
+
+# Stands in for an imported record whose bytes are not valid UTF-8.
+INVALID_UTF8 = object()
+
+SORT_COLUMNS = {
+    'id': Product.id,
+    'name': Product.name,
+    'price': Product.price,
+}
+
+
+def _sort_keys(sort: ProductSort):
+    descending = sort.startswith('-')
+    sort_column = SORT_COLUMNS[sort.removeprefix('-')]
+
+    if sort_column is Product.id:
+        return [Product.id], descending
+
+    return [sort_column, Product.id], descending
+
+
+def _encode_ndjson(rows) -> str:
+    return ''.join(
+        json.dumps({
+            'id': row.id,
+            'name': row.name,
+            'brand': row.brand,
+            'price': float(row.price),
+            'type': row.type.value,
+        })
+        + '\n'
+        for row in rows
+    )
+
+
+def _encode_csv(rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        (row.id, row.name, row.brand, row.price, row.type.value)
+        for row in rows
+    )
+
+    return buffer.getvalue()
+
+
+def _read_ndjson(lines):
+    for line_number, line in enumerate(lines, start=1):
+        try:
+            text = line.decode('utf-8')
+
+        except UnicodeDecodeError:
+            yield line_number, INVALID_UTF8
+            continue
+
+        if not text.strip():
+            continue
+
+        try:
+            yield line_number, json.loads(text)
+
+        except ValueError:
+            yield line_number, None
+
+
+def _decode_lines(lines, invalid: set[int]):
+    for line_number, line in enumerate(lines, start=1):
+        try:
+            yield line.decode('utf-8')
+
+        except UnicodeDecodeError:
+            invalid.add(line_number)
+            yield line.decode('utf-8', errors='replace')
+
+
+def _read_csv(lines):
+    invalid = set()
+    reader = csv.DictReader(_decode_lines(lines, invalid))
+    last_line = 0
+
+    for record in reader:
+        # A quoted field can span lines, so any of the record's lines
+        # that was not valid UTF-8 rejects it.
+        if any(last_line < line <= reader.line_num for line in invalid):
+            yield reader.line_num, INVALID_UTF8
+        else:
+            yield reader.line_num, record
+
+        last_line = reader.line_num
+
+
+def _bulk_results(products: list[ProductCreate], inserted: dict[str, int]):
+    results = []
+
+    for index, product in enumerate(products):
+        # Only the first occurrence of a name can own the inserted row
+        if product_id := inserted.pop(product.name, None):
+            results.append({
+                'index': index,
+                'name': product.name,
+                'status': ProductBulkStatus.CREATED,
+                'id': product_id,
+            })
+        else:
+            results.append({
+                'index': index,
+                'name': product.name,
+                'status': ProductBulkStatus.CONFLICT,
+            })
+
+    return results
+
+
+async def _import_chunk(session, chunk):
+    """Validate and insert one chunk of ``(line, record)`` pairs.
+
+    The chunk is committed on its own and the rejected rows are returned,
+    ordered by line.
+    """
+    products, lines, report = [], [], []
+
+    for line, record in chunk:
+        if record is INVALID_UTF8:
+            report.append({
+                'type': 'rejected',
+                'line': line,
+                'errors': [{'msg': 'Invalid UTF-8'}],
+            })
+            continue
+
+        try:
+            products.append(ProductCreate.model_validate(record))
+            lines.append(line)
+
+        except ValidationError as exc:
+            report.append({
+                'type': 'rejected',
+                'line': line,
+                'errors': exc.errors(
+                    include_url=False,
+                    include_context=False,
+                    include_input=False,
+                ),
+            })
+
+    results = _bulk_results(
+        products, await _insert_products(session, products)
+    )
+    await session.commit()
+
+    report.extend(
+        {
+            'type': 'rejected',
+            'line': lines[result['index']],
+            'errors': [{'msg': 'Product name already exists'}],
+        }
+        for result in results
+        if result['status'] == ProductBulkStatus.CONFLICT
+    )
+
+    return sorted(report, key=lambda entry: entry['line'])
+
+
+def _check_bulk_size(products: list[ProductCreate]):
+    if len(products) > settings.PRODUCT_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            detail=(
+                f'At most {settings.PRODUCT_BULK_MAX_ITEMS} products '
+                'per request'
+            ),
+        )
+
+
+def _decode_since(since: str | None):
+    if since is None:
+        return None
+
+    match decode_cursor(CHANGES_SIGNATURE, since):
+        case [str() as changed_at, int() as product_id]:
+            return changed_at, product_id
+
+    raise HTTPException(
+        status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor'
+    )
+
+
+def _changed_since(stmt, changed_at, key, since, limit: int):
+    """Restrict one side of the change feed to settled rows past ``since``.
+
+    ``changed_at`` is compared as the stored text, so the cursor round-trips
+    exactly. Rows from the last ``CHANGES_SETTLE_SECONDS`` are held back
+    because timestamps only have one-second resolution and that second may
+    still gain rows that sort before ones already returned.
+    """
+    settled_at = func.datetime(
+        'now', f'-{settings.CHANGES_SETTLE_SECONDS} seconds'
+    )
+    stmt = stmt.where(changed_at <= settled_at)
+
+    if since is not None:
+        stmt = stmt.where(
+            tuple_(changed_at, key)
+            > tuple_(literal(since[0], String), since[1])
+        )
+
+    return stmt.order_by(changed_at, key).limit(limit).subquery()
+
+
+def _parse_ids(raw: str) -> list[int]:
+    try:
+        return [int(product_id) for product_id in raw.split(',')]
+
+    except ValueError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail='Invalid product ids'
+        )
+
+
+async def _fetch_products(session, ids: list[int]):
+    """Resolve ``ids`` with a single ``IN`` query.
+
+    Products come back in the requested order, each id at most once, and
+    ids with no matching product are reported as missing.
+    """
+    ids = list(dict.fromkeys(ids))
+
+    if len(ids) > settings.PRODUCT_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            detail=(
+                f'At most {settings.PRODUCT_BATCH_MAX_IDS} product ids '
+                'per request'
+            ),
+        )
+
+    result = await session.execute(
+        select(*PRODUCT_COLUMNS.values()).where(
+            Product.id.in_(ids), Product.deleted_at.is_(None)
+        )
+    )
+    found = {product.id: product for product in result}
+
+    return {
+        'products': [
+            found[product_id] for product_id in ids if product_id in found
+        ],
+        'missing': [
+            product_id for product_id in ids if product_id not in found
+        ],
+    }
+
+
+async def _check_live_product(session, product_id: int):
+    if not await session.scalar(
+        select(Product.id).where(
+            Product.id == product_id, Product.deleted_at.is_(None)
+        )
+    ):
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='Product not found'
+        )
+
+
+def _holders(product_id: int, *columns):
+    # Served by ix_products_users_product_id; the users join only drops
+    # holders that are waiting to be purged.
+    return (
+        select(*columns)
+        .join_from(ProductUser, User)
+        .where(ProductUser.product_id == product_id, User.deleted_at.is_(None))
+    )
+
+
+async def _insert_products(session, products: list[ProductCreate]):
+    """Insert products in multi-row batches, skipping existing names.
+
+    Returns a mapping of every inserted name to its new id.
+    """
+    inserted = {}
+    batch_size = settings.PRODUCT_BULK_BATCH_SIZE
+
+    for start in range(0, len(products), batch_size):
+        stmt = (
+            insert(Product)
+            .values([
+                product.model_dump()
+                for product in products[start : start + batch_size]
+            ])
+            .on_conflict_do_nothing(
+                index_elements=[Product.name],
+                index_where=Product.deleted_at.is_(None),
+            )
+            .returning(Product.name, Product.id)
+        )
+
+        result = await session.execute(stmt)
+        inserted.update(result.all())
+
+    return inserted
+
 
 @router.post(
     '/', status_code=HTTPStatus.CREATED, response_model=ProductResponse
@@ -26,83 +403,504 @@ async def create_product(
     product: ProductCreate,
     session: T_Session,
 ):
-    db_product = await session.scalar(
-        select(Product).where(Product.name == product.name)
+    new_product = Product(
+        name=product.name,
+        brand=product.brand,
+        type=product.type,
+        price=product.price,
     )
 
-    if db_product:
+    try:
+        session.add(new_product)
+        await session.commit()
+
+    except IntegrityError:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail='Product name already exits',
         )
 
-    new_product = Product(
-        name=product.name,
-        brand=product.brand,
-        type=product.type,
-        price=product.price,
+    return new_product
+
+
+@router.post('/bulk', response_model=ProductsBulkResponse)
+async def create_products_bulk(
+    products: list[ProductCreate],
+    session: T_Session,
+):
+    _check_bulk_size(products)
+
+    inserted = await _insert_products(session, products)
+    await session.commit()
+
+    results = _bulk_results(products, inserted)
+    created = sum(
+        result['status'] == ProductBulkStatus.CREATED for result in results
     )
 
-    session.add(new_product)
+    return {
+        'created': created,
+        'conflicts': len(results) - created,
+        'results': results,
+    }
+
+
+@router.post('/batch', response_model=ProductsBatchResponse)
+async def read_products_batch(product_ids: ProductIds, session: T_Session):
+    return await _fetch_products(session, product_ids.ids)
+
+
+@router.post('/import', response_class=StreamingResponse)
+async def import_products(
+    filter_import: Annotated[FilterImport, Query()],
+    request: Request,
+    session: T_Session,
+):
+    # Spool the upload first: the body cannot be read once the response
+    # has started, and the spool only stays in memory while it is small.
+    spool = SpooledTemporaryFile(max_size=settings.IMPORT_SPOOL_MAX_SIZE)
+
+    async for chunk in request.stream():
+        spool.write(chunk)
+
+    spool.seek(0)
+
+    if filter_import.format == CatalogFormat.CSV:
+        read_records = _read_csv
+    else:
+        read_records = _read_ndjson
+
+    async def stream_report():
+        processed = rejected = 0
+
+        with spool:
+            records = read_records(spool)
+
+            async with AsyncSession(
+                session.bind, expire_on_commit=False
+            ) as import_session:
+                while chunk := list(
+                    islice(records, settings.IMPORT_CHUNK_SIZE)
+                ):
+                    report = await _import_chunk(import_session, chunk)
+
+                    processed += len(chunk)
+                    rejected += len(report)
+                    report.append({
+                        'type': 'progress',
+                        'processed': processed,
+                        'inserted': processed - rejected,
+                        'rejected': rejected,
+                    })
+
+                    yield ''.join(json.dumps(entry) + '\n' for entry in report)
+
+        yield (
+            json.dumps({
+                'type': 'summary',
+                'processed': processed,
+                'inserted': processed - rejected,
+                'rejected': rejected,
+            })
+            + '\n'
+        )
+
+    return StreamingResponse(
+        stream_report(), media_type='application/x-ndjson'
+    )
+
+
+@router.put('/sync', response_model=ProductsSyncResponse)
+async def sync_products(
+    products: list[ProductCreate],
+    session: T_Session,
+):
+    _check_bulk_size(products)
+
+    # The feed is keyed by name, so the last record for a name wins
+    records = list({product.name: product for product in products}.values())
+    batch_size = settings.PRODUCT_BULK_BATCH_SIZE
+    inserted = updated = 0
+
+    # An empty UPDATE takes SQLite's write lock for the rest of the
+    # transaction, so no other writer can create or delete a product
+    # between reading the existing names and upserting them, and the
+    # counts below describe exactly what the upserts did.
+    await session.execute(update(Product).where(false()).values(id=Product.id))
+
+    for start in range(0, len(records), batch_size):
+        batch = records[start : start + batch_size]
+
+        existing = set(
+            await session.scalars(
+                select(Product.name).where(
+                    Product.name.in_([product.name for product in batch]),
+                    Product.deleted_at.is_(None),
+                )
+            )
+        )
+
+        stmt = insert(Product).values([
+            product.model_dump() for product in batch
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Product.name],
+            index_where=Product.deleted_at.is_(None),
+            set_={
+                'brand': stmt.excluded.brand,
+                'price': stmt.excluded.price,
+                'type': stmt.excluded.type,
+                'updated_at': func.now(),
+            },
+            where=or_(
+                Product.brand.is_distinct_from(stmt.excluded.brand),
+                Product.price.is_distinct_from(stmt.excluded.price),
+                Product.type.is_distinct_from(stmt.excluded.type),
+            ),
+        ).returning(Product.name)
+
+        written = set(await session.scalars(stmt))
+        updated += len(written & existing)
+        inserted += len(written - existing)
+
     await session.commit()
-    await session.refresh(new_product)
 
-    return new_product
+    return {
+        'inserted': inserted,
+        'updated': updated,
+        'unchanged': len(records) - inserted - updated,
+    }
 
 
 @router.get('/', response_model=ProductsResponse)
 async def read_products(
-    filter_products: Annotated[FilterPage, Query()], session: T_Session
+    filter_products: Annotated[FilterProducts, Query()],
+    conditional: Annotated[ConditionalHeaders, Header()],
+    session: T_Session,
 ):
-    query = await session.scalars(
-        select(Product)
-        .offset(filter_products.offset)
-        .limit(filter_products.limit)
+    fields = parse_fields(filter_products.fields, PRODUCT_COLUMNS)
+    page_keys, descending = _sort_keys(filter_products.sort)
+
+    stmt = select(
+        *projection(PRODUCT_COLUMNS, fields, *page_keys, Product.updated_at)
+    ).where(Product.deleted_at.is_(None))
+
+    if filter_products.type:
+        stmt = stmt.where(Product.type == filter_products.type)
+
+    if filter_products.brand:
+        stmt = stmt.where(Product.brand == filter_products.brand)
+
+    if filter_products.min_price is not None:
+        stmt = stmt.where(Product.price >= filter_products.min_price)
+
+    if filter_products.max_price is not None:
+        stmt = stmt.where(Product.price <= filter_products.max_price)
+
+    result = await session.execute(
+        paginate(stmt, page_keys, filter_products, descending)
+    )
+
+    products = result.all()
+
+    headers = cache_validators(
+        products,
+        [*(fields or PRODUCT_COLUMNS), 'updated_at'],
+        last_modified=False,
+    )
+
+    if not_modified := not_modified_response(conditional, headers):
+        return not_modified
+
+    return product_serializer.page(
+        products,
+        next_cursor(products, page_keys, filter_products, descending),
+        fields,
+        headers,
+    )
+
+
+@router.get('/batch', response_model=ProductsBatchResponse)
+async def read_products_by_ids(
+    filter_ids: Annotated[FilterProductIds, Query()], session: T_Session
+):
+    return await _fetch_products(session, _parse_ids(filter_ids.ids))
+
+
+@router.get('/changes', response_model=ProductChangesResponse)
+async def read_product_changes(
+    filter_changes: Annotated[FilterChanges, Query()], session: T_Session
+):
+    since = _decode_since(filter_changes.since)
+    updated_at = type_coerce(Product.updated_at, String)
+    deleted_at = type_coerce(ProductTombstone.deleted_at, String)
+
+    # Each side walks its own (timestamp, id) index and stops after one
+    # page, so a sync only reads rows that changed since the cursor.
+    upserts = _changed_since(
+        select(
+            *PRODUCT_COLUMNS.values(),
+            updated_at.label('changed_at'),
+            false().label('deleted'),
+        ).where(Product.deleted_at.is_(None)),
+        updated_at,
+        Product.id,
+        since,
+        filter_changes.limit,
+    )
+    deletes = _changed_since(
+        select(
+            *(
+                ProductTombstone.product_id.label(field)
+                if field == 'id'
+                else null().label(field)
+                for field in PRODUCT_COLUMNS
+            ),
+            deleted_at.label('changed_at'),
+            true().label('deleted'),
+        ),
+        deleted_at,
+        ProductTombstone.product_id,
+        since,
+        filter_changes.limit,
     )
 
-    products = query.all()
+    changes = union_all(
+        select(*upserts.c.values()), select(*deletes.c.values())
+    ).subquery()
+
+    result = await session.execute(
+        select(changes)
+        .order_by(changes.c.changed_at, changes.c.id)
+        .limit(filter_changes.limit)
+    )
+    rows = result.all()
+
+    if rows:
+        cursor = encode_cursor(
+            CHANGES_SIGNATURE, [rows[-1].changed_at, rows[-1].id]
+        )
+    else:
+        cursor = filter_changes.since
+
+    return {
+        'changes': [
+            {
+                'id': row.id,
+                'changed_at': row.changed_at,
+                'deleted': row.deleted,
+                'product': None if row.deleted else row,
+            }
+            for row in rows
+        ],
+        'next_cursor': cursor,
+    }
+
+
+@router.get('/export', response_class=StreamingResponse)
+async def export_products(
+    filter_export: Annotated[FilterExport, Query()], session: T_Session
+):
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    stmt = (
+        select(*(getattr(Product, field) for field in EXPORT_FIELDS))
+        .where(Product.deleted_at.is_(None))
+        .order_by(Product.id)
+        .limit(chunk_size)
+    )
+
+    if filter_export.format == CatalogFormat.CSV:
+        encode, media_type = _encode_csv, 'text/csv'
+    else:
+        encode, media_type = _encode_ndjson, 'application/x-ndjson'
+
+    async def stream_rows():
+        if filter_export.format == CatalogFormat.CSV:
+            yield ','.join(EXPORT_FIELDS) + '\r\n'
+
+        last_id = 0
+
+        # One short keyset query per chunk, each through its own session
+        # because the request session is closed once this handler returns.
+        # No cursor stays open while the client reads, so on SQLite the
+        # export does not hold a lock that would block writers.
+        while True:
+            async with AsyncSession(session.bind) as export_session:
+                rows = (
+                    await export_session.execute(
+                        stmt.where(Product.id > last_id)
+                    )
+                ).all()
+
+            if not rows:
+                break
+
+            yield encode(rows)
 
-    return {'products': products}
+            if len(rows) < chunk_size:
+                break
+
+            last_id = rows[-1].id
+
+    return StreamingResponse(
+        stream_rows(),
+        media_type=media_type,
+        headers={
+            'Content-Disposition': (
+                f'attachment; filename=products.{filter_export.format}'
+            )
+        },
+    )
+
+
+@router.get('/facets', response_model=ProductFacetsResponse)
+async def read_product_facets(session: T_Session):
+    facets = await session.scalars(
+        select(ProductFacet)
+        .where(ProductFacet.count > 0)
+        .order_by(ProductFacet.facet, ProductFacet.value)
+    )
+
+    types, brands, prices = [], [], []
+
+    for facet in facets:
+        if facet.facet == 'type':
+            # Enum columns are stored by member name
+            types.append({
+                'value': ProductType[facet.value],
+                'count': facet.count,
+            })
+        elif facet.facet == 'brand':
+            brands.append({'value': facet.value, 'count': facet.count})
+        else:
+            min_price = float(facet.value)
+            prices.append({
+                'min_price': min_price,
+                'max_price': min_price + PRICE_BUCKET_WIDTH,
+                'count': facet.count,
+            })
+
+    prices.sort(key=lambda bucket: bucket['min_price'])
+
+    return {'types': types, 'brands': brands, 'prices': prices}
+
+
+@router.get('/search', response_model=ProductsResponse)
+async def search_products(
+    filter_search: Annotated[FilterSearch, Query()], session: T_Session
+):
+    terms = re.findall(r'\w+', filter_search.q)
+
+    if not terms:
+        return {'products': []}
+
+    # Quote every term so user input is never parsed as FTS5 syntax, and
+    # match it as a prefix so partial words still find products.
+    match_query = ' '.join(f'"{term}"*' for term in terms)
+    page_keys = [products_fts.c.rank, Product.id]
+
+    stmt = (
+        select(
+            Product.id,
+            Product.name,
+            Product.brand,
+            Product.price,
+            Product.type,
+            products_fts.c.rank,
+        )
+        .join_from(products_fts, Product, products_fts.c.rowid == Product.id)
+        .where(
+            literal_column('products_fts').op('MATCH')(match_query),
+            Product.deleted_at.is_(None),
+        )
+    )
+
+    result = await session.execute(paginate(stmt, page_keys, filter_search))
+    products = result.all()
+
+    return {
+        'products': products,
+        'next_cursor': next_cursor(products, page_keys, filter_search),
+    }
 
 
 @router.get('/{product_id}', response_model=ProductResponse)
-async def read_product(product_id: int, session: T_Session):
-    db_product = await session.scalar(
-        select(Product).where(Product.id == product_id)
+async def read_product(
+    product_id: int,
+    fieldset: Annotated[Fieldset, Query()],
+    conditional: Annotated[ConditionalHeaders, Header()],
+    session: T_Session,
+):
+    fields = parse_fields(fieldset.fields, PRODUCT_COLUMNS)
+
+    result = await session.execute(
+        select(*projection(PRODUCT_COLUMNS, fields, Product.updated_at)).where(
+            Product.id == product_id, Product.deleted_at.is_(None)
+        )
     )
 
-    if not db_product:
+    if not (db_product := result.first()):
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='Product not found'
         )
 
-    return db_product
+    headers = cache_validators(
+        [db_product], [*(fields or PRODUCT_COLUMNS), 'updated_at']
+    )
 
+    if not_modified := not_modified_response(conditional, headers):
+        return not_modified
 
-@router.put('/{product_id}', response_model=ProductResponse)
-async def update_product(
-    product_id, product: ProductUpdate, session: T_Session
+    return product_serializer.item(db_product, fields, headers)
+
+
+@router.get('/{product_id}/holders', response_model=ProductHoldersResponse)
+async def read_product_holders(
+    product_id: int,
+    page: Annotated[FilterPage, Query()],
+    session: T_Session,
 ):
-    db_product = await session.scalar(
-        select(Product).where(Product.id == product_id)
+    await _check_live_product(session, product_id)
+
+    page_keys = [ProductUser.user_id]
+    stmt = _holders(product_id, ProductUser.user_id, ProductUser.quantity)
+
+    result = await session.execute(paginate(stmt, page_keys, page))
+    holders = result.all()
+
+    return holder_serializer.page(
+        holders, next_cursor(holders, page_keys, page)
     )
 
-    if not db_product:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND, detail='Product not found'
+
+@router.get('/{product_id}/holders/count', response_model=ProductHoldersCount)
+async def count_product_holders(product_id: int, session: T_Session):
+    await _check_live_product(session, product_id)
+
+    result = await session.execute(
+        _holders(
+            product_id,
+            func.count(),
+            func.coalesce(func.sum(ProductUser.quantity), 0),
         )
+    )
+    holders, items = result.one()
 
-    try:
-        db_product.name = product.name
-        db_product.brand = product.brand
-        db_product.price = product.price
-        db_product.type = product.type
+    return {'product_id': product_id, 'holders': holders, 'items': items}
 
-        session.add(db_product)
-        await session.commit()
-        await session.refresh(db_product)
 
-        return db_product
+@router.put('/{product_id}', response_model=ProductResponse)
+async def update_product(
+    product_id: int, product: ProductUpdate, session: T_Session
+):
+    try:
+        db_product = await session.scalar(
+            update(Product)
+            .where(Product.id == product_id, Product.deleted_at.is_(None))
+            .values(**product.model_dump())
+            .returning(Product)
+        )
+        await session.commit()
 
     except IntegrityError:
         raise HTTPException(
@@ -110,21 +908,28 @@ async def update_product(
             detail='Product name already exists',
         )
 
+    if not db_product:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='Product not found'
+        )
+
+    return db_product
+
 
 @router.delete('/{product_id}', response_model=ProductResponse)
 async def delete_product(product_id: int, session: T_Session):
-    db_product = await session.scalar(
-        select(Product).where(Product.id == product_id)
+    # Soft delete; the purge worker removes the row later.
+    deleted_product = await session.scalar(
+        update(Product)
+        .where(Product.id == product_id, Product.deleted_at.is_(None))
+        .values(deleted_at=func.now())
+        .returning(Product)
     )
+    await session.commit()
 
-    if not db_product:
+    if not deleted_product:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='Product not found'
         )
 
-    deleted_product = db_product
-
-    await session.delete(db_product)
-    await session.commit()
-
     return deleted_product
@@ -1,36 +1,208 @@
+import string
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from fastapi_products_api.dependencies import T_CurrentUser, T_Session
+from fastapi_products_api.fieldsets import parse_fields, projection
+from fastapi_products_api.hashing import password_hasher
+from fastapi_products_api.jobs import job_registry
 from fastapi_products_api.models.users import User
+from fastapi_products_api.pagination import next_cursor, paginate
+from fastapi_products_api.schemas.fieldsets import Fieldset
 from fastapi_products_api.schemas.users import (
     FilterUsers,
     ResponseUser,
     ResponseUserList,
+    UserBulkStatus,
     UserCreate,
+    UserPrefixField,
+    UsersBulkJob,
+    UsersBulkResponse,
     UserUpdate,
 )
-from fastapi_products_api.security import get_password_hash
+from fastapi_products_api.security import (
+    get_current_superuser,
+    principal_cache,
+    revoke_user_tokens,
+)
+from fastapi_products_api.serialization import RowSerializer
+from fastapi_products_api.settings import Settings
+
+settings = Settings()
 
 router = APIRouter(prefix='/users', tags=['users'])
 
+USER_COLUMNS = {
+    field: getattr(User, field) for field in ResponseUser.model_fields
+}
+
+PREFIX_COLUMNS = {
+    UserPrefixField.USERNAME: User.username_normalized,
+    UserPrefixField.EMAIL: User.email_normalized,
+}
+
+# Sorts after every string that starts with a given prefix, so
+# ``prefix <= value < prefix || PREFIX_UPPER_BOUND`` is an index range.
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+user_serializer = RowSerializer(ResponseUser, key='users')
+
+# Bulk provisioning can fill the shared hashing pool and job results list
+# every created account, so it is reserved for superusers.
+SUPERUSER_ONLY = [Depends(get_current_superuser)]
+
+# SQLite's lower(), which maintains the normalized columns, only folds
+# ASCII letters.
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _normalize(value: str) -> str:
+    return value.translate(ASCII_LOWER)
+
+
+def _check_bulk_size(users: list[UserCreate], max_items: int):
+    if len(users) > max_items:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            detail=f'At most {max_items} users per request',
+        )
+
+
+async def _insert_users(session, users: list[UserCreate]):
+    """Create ``users`` in batches, committing after each one.
+
+    Rows whose username or email is already taken, in any letter case, by
+    a live account or an earlier row, are reported as conflicts before any
+    hashing, so only the accounts that will be inserted pay for Argon2.
+    """
+    results = []
+    usernames, emails = set(), set()
+    batch_size = settings.USER_BULK_BATCH_SIZE
+
+    for start in range(0, len(users), batch_size):
+        batch = users[start : start + batch_size]
+
+        normalized = [
+            (_normalize(user.username), _normalize(user.email))
+            for user in batch
+        ]
+
+        taken = await session.execute(
+            select(User.username_normalized, User.email_normalized).where(
+                or_(
+                    User.username_normalized.in_([
+                        username for username, _ in normalized
+                    ]),
+                    User.email_normalized.in_([
+                        email for _, email in normalized
+                    ]),
+                ),
+                User.deleted_at.is_(None),
+            )
+        )
+
+        for username, email in taken:
+            usernames.add(username)
+            emails.add(email)
+
+        candidates = {}
+
+        for index, (user, (username, email)) in enumerate(
+            zip(batch, normalized), start
+        ):
+            if username in usernames or email in emails:
+                continue
+
+            usernames.add(username)
+            emails.add(email)
+            candidates[index] = user
+
+        hashed_passwords = await password_hasher.hash_many([
+            user.password for user in candidates.values()
+        ])
+        inserted = {}
+
+        if candidates:
+            result = await session.execute(
+                insert(User)
+                .values([
+                    {**user.model_dump(), 'password': hashed_password}
+                    for user, hashed_password in zip(
+                        candidates.values(), hashed_passwords
+                    )
+                ])
+                .on_conflict_do_nothing()
+                .returning(User.username, User.id)
+            )
+            inserted = dict(result.all())
+            await session.commit()
+
+        for index, user in enumerate(batch, start):
+            if index in candidates and (
+                user_id := inserted.get(user.username)
+            ):
+                results.append({
+                    'index': index,
+                    'username': user.username,
+                    'status': UserBulkStatus.CREATED,
+                    'id': user_id,
+                })
+            else:
+                results.append({
+                    'index': index,
+                    'username': user.username,
+                    'status': UserBulkStatus.CONFLICT,
+                })
+
+    created = sum(
+        result['status'] == UserBulkStatus.CREATED for result in results
+    )
+
+    return {
+        'created': created,
+        'conflicts': len(results) - created,
+        'results': results,
+    }
+
+
+async def _bump_token_version(session, user: User) -> int:
+    # Incremented in SQL: ``user`` may be a stale cached principal, and
+    # writing its version + 1 back could leave old tokens valid.
+    token_version = await session.scalar(
+        update(User)
+        .where(User.id == user.id)
+        .values(token_version=User.token_version + 1)
+        .returning(User.token_version)
+        .execution_options(synchronize_session='fetch')
+    )
+    await session.refresh(user)
+
+    return token_version
+
+
+async def _run_bulk_job(bind, users: list[UserCreate]):
+    # The request session is closed before background tasks run.
+    async with AsyncSession(bind, expire_on_commit=False) as job_session:
+        return await _insert_users(job_session, users)
+
 
 @router.post('/', status_code=HTTPStatus.CREATED, response_model=ResponseUser)
 async def create_user(user: UserCreate, session: T_Session):
-    try:
-        new_user_data = user.model_dump()
-        if 'password' in new_user_data:
-            new_user_data['password'] = get_password_hash(user.password)
+    new_user_data = user.model_dump()
+    if 'password' in new_user_data:
+        new_user_data['password'] = await password_hasher.hash(user.password)
 
-        new_user = User(**new_user_data)
+    new_user = User(**new_user_data)
+    session.add(new_user)
 
-        session.add(new_user)
+    try:
         await session.commit()
-        await session.refresh(new_user)
 
     except IntegrityError:
         raise HTTPException(
@@ -41,29 +213,100 @@ async def create_user(user: UserCreate, session: T_Session):
     return new_user
 
 
+@router.post(
+    '/bulk', response_model=UsersBulkResponse, dependencies=SUPERUSER_ONLY
+)
+async def create_users_bulk(users: list[UserCreate], session: T_Session):
+    _check_bulk_size(users, settings.USER_BULK_MAX_ITEMS)
+
+    return await _insert_users(session, users)
+
+
+@router.post(
+    '/bulk/jobs',
+    status_code=HTTPStatus.ACCEPTED,
+    response_model=UsersBulkJob,
+    dependencies=SUPERUSER_ONLY,
+)
+async def create_users_bulk_job(
+    users: list[UserCreate],
+    background_tasks: BackgroundTasks,
+    session: T_Session,
+):
+    _check_bulk_size(users, settings.USER_BULK_JOB_MAX_ITEMS)
+
+    job = job_registry.create(total=len(users))
+    background_tasks.add_task(
+        job_registry.run, job['id'], _run_bulk_job, session.bind, users
+    )
+
+    return job
+
+
+@router.get(
+    '/bulk/jobs/{job_id}',
+    response_model=UsersBulkJob,
+    dependencies=SUPERUSER_ONLY,
+)
+async def read_users_bulk_job(job_id: str):
+    if not (job := job_registry.get(job_id)):
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='Job not found'
+        )
+
+    return job
+
+
 @router.get('/{user_id}', response_model=ResponseUser)
-async def read_user(user_id: int, session: T_Session):
-    db_user = await session.scalar(select(User).where(User.id == user_id))
+async def read_user(
+    user_id: int,
+    fieldset: Annotated[Fieldset, Query()],
+    session: T_Session,
+):
+    fields = parse_fields(fieldset.fields, USER_COLUMNS)
 
-    if not db_user:
+    result = await session.execute(
+        select(*projection(USER_COLUMNS, fields)).where(
+            User.id == user_id, User.deleted_at.is_(None)
+        )
+    )
+
+    if not (db_user := result.first()):
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='User not found'
         )
 
-    return db_user
+    return user_serializer.item(db_user, fields)
 
 
 @router.get('/', response_model=ResponseUserList)
 async def read_users(
     filter_users: Annotated[FilterUsers, Query()], session: T_Session
 ):
-    query = await session.scalars(
-        select(User).offset(filter_users.offset).limit(filter_users.limit)
+    fields = parse_fields(filter_users.fields, USER_COLUMNS)
+    page_keys = [User.id]
+    conditions = [User.deleted_at.is_(None)]
+
+    if filter_users.prefix:
+        prefix_column = PREFIX_COLUMNS[filter_users.prefix_field]
+        prefix = func.lower(filter_users.prefix)
+        page_keys = [prefix_column, User.id]
+        conditions += [
+            prefix_column >= prefix,
+            prefix_column < prefix + PREFIX_UPPER_BOUND,
+        ]
+
+    stmt = select(*projection(USER_COLUMNS, fields, *page_keys)).where(
+        *conditions
     )
 
-    db_users = query.all()
+    result = await session.execute(paginate(stmt, page_keys, filter_users))
+
+    db_users = result.all()
 
-    return {'users': db_users}
+    return user_serializer.page(
+        db_users, next_cursor(db_users, page_keys, filter_users), fields
+    )
 
 
 @router.patch('/{user_id}', response_model=ResponseUser)
@@ -79,16 +322,24 @@ async def update_user(
             detail='Not enough permissions',
         )
 
+    username = current_user.username
+    changes = user.model_dump(exclude_unset=True)
+
+    if 'password' in changes:
+        changes['password'] = await password_hasher.hash(changes['password'])
+
+    for key, value in changes.items():
+        setattr(current_user, key, value)
+
+    session.add(current_user)
+
+    token_version = None
+
     try:
-        for key, value in user.model_dump(exclude_unset=True).items():
-            if key == 'password':
-                setattr(current_user, key, get_password_hash(value))
-            else:
-                setattr(current_user, key, value)
+        if 'password' in changes:
+            token_version = await _bump_token_version(session, current_user)
 
-        session.add(current_user)
         await session.commit()
-        await session.refresh(current_user)
 
     except IntegrityError:
         raise HTTPException(
@@ -96,6 +347,13 @@ async def update_user(
             detail='Username or email already exists',
         )
 
+    # Dropped only once the change is committed, so a request that read
+    # the old row meanwhile cannot leave it cached.
+    principal_cache.invalidate(username)
+
+    if token_version is not None:
+        revoke_user_tokens(user_id, token_version)
+
     return current_user
 
 
@@ -109,9 +367,14 @@ async def delete_user(
             detail='Not enough permissions',
         )
 
-    deleted_user = current_user
+    current_user.deleted_at = func.now()
 
-    await session.delete(current_user)
+    session.add(current_user)
+    token_version = await _bump_token_version(session, current_user)
     await session.commit()
 
-    return deleted_user
+    principal_cache.invalidate(current_user.username)
+
+    revoke_user_tokens(user_id, token_version)
+
+    return current_user
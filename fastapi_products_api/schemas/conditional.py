@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class ConditionalHeaders(BaseModel):
+    if_none_match: str | None = None
+    if_modified_since: str | None = None
+
+
+class WritePreconditions(BaseModel):
+    if_match: str | None = None
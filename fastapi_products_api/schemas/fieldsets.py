@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+
+class Fieldset(BaseModel):
+    fields: str | None = None
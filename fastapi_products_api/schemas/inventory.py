@@ -1,6 +1,7 @@
 from datetime import datetime
+from enum import StrEnum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from fastapi_products_api.models.enums import ProductType
 
@@ -10,11 +11,12 @@ class InventoryBase(BaseModel):
 
 
 class UserInventoryAddProduct(InventoryBase):
-    quantity: int | None = 1
+    quantity: int = Field(default=1, gt=0)
 
 
 class ResponseUserInventoryAddProduct(InventoryBase):
     quantity: int
+    version: int
     created_at: datetime
     updated_at: datetime
 
@@ -29,16 +31,21 @@ class ResponseUserInventoryReadProduct(InventoryBase):
 
 class ResponseUserInventoryReadList(BaseModel):
     products: list[ResponseUserInventoryReadProduct]
+    next_cursor: str | None = None
 
 
 class FilterUserInventory(BaseModel):
     offset: int = 0
     limit: int = 100
+    cursor: str | None = None
+    fields: str | None = None
 
 
 class UserInventoryUpdateProduct(BaseModel):
     product_id: int
-    quantity: int
+    quantity: int | None = Field(default=None, ge=0)
+    delta: int | None = None
+    expected_version: int | None = None
 
 
 class ResponseUserInventoryUpdateProductQuantity(InventoryBase):
@@ -47,3 +54,58 @@ class ResponseUserInventoryUpdateProductQuantity(InventoryBase):
     price: float
     type: ProductType
     quantity: int
+    version: int
+
+
+class InventoryOperationKind(StrEnum):
+    ADD = 'add'
+    SET = 'set'
+    DELTA = 'delta'
+
+
+class UserInventoryOperation(InventoryBase):
+    op: InventoryOperationKind
+    quantity: int = 1
+
+
+class UserInventoryBatch(BaseModel):
+    operations: list[UserInventoryOperation] = Field(min_length=1)
+
+
+class ResponseUserInventoryBatch(BaseModel):
+    products: list[ResponseUserInventoryReadProduct]
+
+
+class FilterInventorySummary(BaseModel):
+    cached: bool = False
+
+
+class InventoryTypeSummary(BaseModel):
+    type: ProductType
+    products: int
+    items: int
+    value: float
+
+
+class ResponseUserInventorySummary(BaseModel):
+    products: int
+    items: int
+    value: float
+    types: list[InventoryTypeSummary]
+
+
+class ReservationAction(StrEnum):
+    RESERVE = 'reserve'
+    RELEASE = 'release'
+    CONSUME = 'consume'
+
+
+class UserInventoryReservation(InventoryBase):
+    quantity: int = Field(default=1, gt=0)
+    expected_version: int | None = None
+
+
+class ResponseUserInventoryReservation(InventoryBase):
+    quantity: int
+    reserved: int
+    version: int
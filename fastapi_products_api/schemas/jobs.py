@@ -0,0 +1,8 @@
+from enum import StrEnum
+
+
+class JobStatus(StrEnum):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
@@ -1,4 +1,7 @@
-from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from enum import StrEnum
+
+from pydantic import BaseModel, ConfigDict, Field
 
 from fastapi_products_api.models.enums import ProductType
 
@@ -24,10 +27,135 @@ class ProductResponse(ProductBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ProductBulkStatus(StrEnum):
+    CREATED = 'created'
+    CONFLICT = 'conflict'
+
+
+class ProductBulkResult(BaseModel):
+    index: int
+    name: str
+    status: ProductBulkStatus
+    id: int | None = None
+
+
+class ProductsBulkResponse(BaseModel):
+    created: int
+    conflicts: int
+    results: list[ProductBulkResult]
+
+
+class ProductsSyncResponse(BaseModel):
+    inserted: int
+    updated: int
+    unchanged: int
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class PriceBucketCount(BaseModel):
+    min_price: float
+    max_price: float
+    count: int
+
+
+class ProductFacetsResponse(BaseModel):
+    types: list[FacetCount]
+    brands: list[FacetCount]
+    prices: list[PriceBucketCount]
+
+
 class ProductsResponse(BaseModel):
     products: list[ProductResponse]
+    next_cursor: str | None = None
+
+
+class ProductIds(BaseModel):
+    ids: list[int] = Field(min_length=1)
+
+
+class ProductsBatchResponse(BaseModel):
+    products: list[ProductResponse]
+    missing: list[int]
+
+
+class ProductHolder(BaseModel):
+    user_id: int
+    quantity: int
+
+
+class ProductHoldersResponse(BaseModel):
+    holders: list[ProductHolder]
+    next_cursor: str | None = None
+
+
+class ProductHoldersCount(BaseModel):
+    product_id: int
+    holders: int
+    items: int
+
+
+class ProductChange(BaseModel):
+    id: int
+    changed_at: datetime
+    deleted: bool
+    product: ProductResponse | None = None
+
+
+class ProductChangesResponse(BaseModel):
+    changes: list[ProductChange]
+    next_cursor: str | None = None
+
+
+class CatalogFormat(StrEnum):
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+
+class ProductSort(StrEnum):
+    ID = 'id'
+    ID_DESC = '-id'
+    NAME = 'name'
+    NAME_DESC = '-name'
+    PRICE = 'price'
+    PRICE_DESC = '-price'
 
 
 class FilterPage(BaseModel):
     offset: int = 0
     limit: int = 100
+    cursor: str | None = None
+
+
+class FilterProducts(FilterPage):
+    type: ProductType | None = None
+    brand: str | None = None
+    min_price: float | None = None
+    max_price: float | None = None
+    sort: ProductSort = ProductSort.ID
+    fields: str | None = None
+
+
+class FilterSearch(FilterPage):
+    q: str = Field(min_length=1)
+    limit: int = 20
+
+
+class FilterChanges(BaseModel):
+    since: str | None = None
+    limit: int = 100
+
+
+class FilterProductIds(BaseModel):
+    ids: str
+
+
+class FilterExport(BaseModel):
+    format: CatalogFormat = CatalogFormat.NDJSON
+
+
+class FilterImport(BaseModel):
+    format: CatalogFormat = CatalogFormat.NDJSON
@@ -1,6 +1,9 @@
 from datetime import datetime
+from enum import StrEnum
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+
+from fastapi_products_api.schemas.jobs import JobStatus
 
 
 class UserBase(BaseModel):
@@ -29,8 +32,44 @@ class ResponseUser(UserBase):
 
 class ResponseUserList(BaseModel):
     users: list[ResponseUser]
+    next_cursor: str | None = None
+
+
+class UserBulkStatus(StrEnum):
+    CREATED = 'created'
+    CONFLICT = 'conflict'
+
+
+class UserBulkResult(BaseModel):
+    index: int
+    username: str
+    status: UserBulkStatus
+    id: int | None = None
+
+
+class UsersBulkResponse(BaseModel):
+    created: int
+    conflicts: int
+    results: list[UserBulkResult]
+
+
+class UsersBulkJob(BaseModel):
+    id: str
+    status: JobStatus
+    total: int
+    result: UsersBulkResponse | None = None
+    detail: str | None = None
+
+
+class UserPrefixField(StrEnum):
+    USERNAME = 'username'
+    EMAIL = 'email'
 
 
 class FilterUsers(BaseModel):
     offset: int = 0
     limit: int = 25
+    cursor: str | None = None
+    fields: str | None = None
+    prefix: str | None = Field(default=None, min_length=1)
+    prefix_field: UserPrefixField = UserPrefixField.USERNAME
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from http import HTTPStatus
 from typing import Annotated
@@ -6,9 +7,12 @@ from zoneinfo import ZoneInfo
 from fastapi import Depends, HTTPException
 from jwt import DecodeError, ExpiredSignatureError, decode, encode
 from pwdlib import PasswordHash
-from sqlalchemy import select
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 
+from fastapi_products_api.cache import PrincipalCache, TokenRevocations
 from fastapi_products_api.database import get_session
 from fastapi_products_api.models.users import User
 from fastapi_products_api.schemas.auth import OAuth_scheme
@@ -18,10 +22,26 @@ settings = Settings()
 
 pwd_context = PasswordHash.recommended()
 
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL
+)
+
+# Recorded by this process whenever a user's tokens are revoked, and kept
+# until every token issued before the revocation has expired.
+token_revocations = TokenRevocations(ttl=settings.ACCESS_TOKEN_EXPIRE * 60)
+
 T_Session = Annotated[AsyncSession, Depends(get_session)]
 T_Token = Annotated[str, Depends(OAuth_scheme)]
 
 
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+    is_superuser: bool
+    token_version: int
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(tz=ZoneInfo('UTC')) + timedelta(
@@ -43,33 +63,152 @@ def verify_password(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
 
 
-async def get_current_user(session: T_Session, token: T_Token):
-    credentials_exeception = HTTPException(
+def create_user_access_token(user: User):
+    return create_access_token(
+        data={
+            'sub': user.username,
+            'uid': user.id,
+            'su': user.is_superuser,
+            'ver': user.token_version,
+        }
+    )
+
+
+def revoke_user_tokens(user_id: int, token_version: int):
+    token_revocations.revoke(user_id, token_version)
+
+
+def _credentials_exception():
+    return HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
         detail='Could not validate credentials!',
         headers={'WWW-Authenticate': 'Bearer'},
     )
 
+
+def _decode_token(token: str):
     try:
         payload = decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        subject_username = payload.get('sub')
-
-        if not subject_username:
-            raise credentials_exeception
 
     except DecodeError:
-        raise credentials_exeception
+        raise _credentials_exception()
 
     except ExpiredSignatureError:
-        raise credentials_exeception
+        raise _credentials_exception()
+
+    if not payload.get('sub'):
+        raise _credentials_exception()
+
+    return payload
+
+
+def _detached_copy(instance):
+    state = inspect(instance)
+    copy = state.mapper.class_manager.new_instance()
+
+    for attr in state.mapper.column_attrs:
+        if attr.key in state.dict:
+            set_committed_value(copy, attr.key, state.dict[attr.key])
+
+    make_transient_to_detached(copy)
+
+    return copy
+
+
+async def get_current_user(session: T_Session, token: T_Token):
+    if cached_user := principal_cache.get(token):
+        return await session.merge(cached_user, load=False)
+
+    payload = _decode_token(token)
 
     db_user = await session.scalar(
-        select(User).where(User.username == subject_username)
+        select(User)
+        .options(defer(User.password, raiseload=True))
+        .where(User.username == payload['sub'], User.deleted_at.is_(None))
     )
 
     if not db_user:
-        raise credentials_exeception
+        raise _credentials_exception()
+
+    if payload.get('ver', db_user.token_version) != db_user.token_version:
+        raise _credentials_exception()
+
+    principal_cache.set(
+        token, db_user.username, _detached_copy(db_user), payload['exp']
+    )
 
     return db_user
+
+
+async def get_current_superuser(
+    current_user: Annotated[User, Depends(get_current_user)],
+):
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
+        )
+
+    return current_user
+
+
+async def get_current_principal(session: T_Session, token: T_Token):
+    """Identify the caller, from the database or, if opted in, the token.
+
+    With ``STATELESS_PRINCIPAL`` the claims are trusted as long as the
+    token version has not been revoked by this process. Revocations are
+    not shared between workers, so a deleted user or an old password
+    keeps working on other workers until the token expires; endpoints
+    that write use ``get_current_writer`` to close that gap.
+    """
+    if not settings.STATELESS_PRINCIPAL:
+        db_user = await get_current_user(session, token)
+
+        return Principal(
+            id=db_user.id,
+            username=db_user.username,
+            is_superuser=db_user.is_superuser,
+            token_version=db_user.token_version,
+        )
+
+    payload = _decode_token(token)
+
+    try:
+        principal = Principal(
+            id=payload['uid'],
+            username=payload['sub'],
+            is_superuser=payload['su'],
+            token_version=payload['ver'],
+        )
+
+    except KeyError:
+        raise _credentials_exception()
+
+    if principal.token_version < token_revocations.min_version(principal.id):
+        raise _credentials_exception()
+
+    return principal
+
+
+async def get_current_writer(session: T_Session, token: T_Token):
+    """Like ``get_current_principal``, with the version checked on writes.
+
+    In stateless mode the token version is checked against the database,
+    so revocations made by any worker apply to writes at once. The default
+    mode goes through the principal cache, so a revoked token can still
+    write for up to ``PRINCIPAL_CACHE_TTL`` on workers that cached it.
+    """
+    principal = await get_current_principal(session, token)
+
+    if settings.STATELESS_PRINCIPAL:
+        token_version = await session.scalar(
+            select(User.token_version).where(
+                User.id == principal.id, User.deleted_at.is_(None)
+            )
+        )
+
+        if token_version != principal.token_version:
+            raise _credentials_exception()
+
+    return principal
@@ -0,0 +1,66 @@
+from collections.abc import Sequence
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+
+class RowSerializer:
+    """Encodes result rows straight to JSON bytes for a response model.
+
+    The row and page shapes are mirrored as ``TypedDict`` adapters built
+    once per model, so a page is serialized in a single pydantic-core pass
+    instead of being validated into models and dumped again. Rows must
+    come from a select whose leading columns are the response fields, in
+    the order given to ``item``/``page``; trailing columns (cursor keys,
+    ``updated_at``) are ignored. The route keeps its ``response_model`` so
+    the OpenAPI schema is unchanged.
+    """
+
+    def __init__(self, model: type[BaseModel], key: str | None = None):
+        self.fields = tuple(model.model_fields)
+        self.key = key
+
+        row = TypedDict(
+            f'{model.__name__}Row',
+            {
+                name: field.annotation
+                for name, field in model.model_fields.items()
+            },
+            total=False,
+        )
+        self._item_adapter = TypeAdapter(row)
+
+        if key is not None:
+            page = TypedDict(
+                f'{model.__name__}Page',
+                {key: list[row], 'next_cursor': str | None},
+            )
+            self._page_adapter = TypeAdapter(page)
+
+    def item(self, row, fields: Sequence[str] | None = None, headers=None):
+        return Response(
+            self._item_adapter.dump_json(
+                dict(zip(fields or self.fields, row))
+            ),
+            media_type='application/json',
+            headers=headers,
+        )
+
+    def page(
+        self,
+        rows,
+        cursor: str | None,
+        fields: Sequence[str] | None = None,
+        headers=None,
+    ):
+        fields = fields or self.fields
+
+        return Response(
+            self._page_adapter.dump_json({
+                self.key: [dict(zip(fields, row)) for row in rows],
+                'next_cursor': cursor,
+            }),
+            media_type='application/json',
+            headers=headers,
+        )
@@ -10,3 +10,40 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE: int
+
+    PASSWORD_HASH_WORKERS: int | None = None
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    PASSWORD_HASH_TIMEOUT: float = 5.0
+
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL: float = 60.0
+
+    # Opt-in: reads trust token claims, so revocations only reach other
+    # workers on writes or once the token expires.
+    STATELESS_PRINCIPAL: bool = False
+
+    PRODUCT_BULK_MAX_ITEMS: int = 10_000
+    PRODUCT_BULK_BATCH_SIZE: int = 500
+
+    PRODUCT_BATCH_MAX_IDS: int = 100
+
+    USER_BULK_MAX_ITEMS: int = 1000
+    USER_BULK_JOB_MAX_ITEMS: int = 100_000
+    USER_BULK_BATCH_SIZE: int = 500
+
+    INVENTORY_BATCH_MAX_ITEMS: int = 100
+
+    INVENTORY_SUMMARY_CACHE_SIZE: int = 1024
+    INVENTORY_SUMMARY_CACHE_TTL: float = 30.0
+
+    JOB_REGISTRY_SIZE: int = 100
+
+    PURGE_INTERVAL: float = 60.0
+    PURGE_BATCH_SIZE: int = 500
+
+    CHANGES_SETTLE_SECONDS: int = 1
+
+    EXPORT_CHUNK_SIZE: int = 1000
+
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_SPOOL_MAX_SIZE: int = 1024 * 1024
@@ -21,12 +21,21 @@ if config.config_file_name is not None:
 target_metadata = table_registry.metadata
 
 
+def include_name(name, type_, parent_names):
+    # FTS5 virtual tables and their shadow tables are managed by hand
+    if type_ == 'table':
+        return not (name or '').startswith('products_fts')
+
+    return True
+
+
 def do_run_migrations(connection):
     context.configure(
         connection=connection,
         target_metadata=target_metadata,
         compare_type=True,
-        render_as_batch=True
+        render_as_batch=True,
+        include_name=include_name
     )
 
     with context.begin_transaction():
@@ -65,7 +74,8 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={'paramstyle': 'named'},
         compare_type=True,
-        render_as_batch=True
+        render_as_batch=True,
+        include_name=include_name
     )
 
     with context.begin_transaction():
@@ -0,0 +1,62 @@
+"""create products fts index
+
+Revision ID: 8b5f2e66d90a
+Revises: 7fbd66314e69
+Create Date: 2026-10-18 10:41:09.207733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b5f2e66d90a'
+down_revision: Union[str, None] = '7fbd66314e69'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE VIRTUAL TABLE products_fts USING fts5(
+            name, brand,
+            content='products', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER products_fts_ai AFTER INSERT ON products
+        BEGIN
+            INSERT INTO products_fts(rowid, name, brand)
+            VALUES (new.id, new.name, new.brand);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER products_fts_ad AFTER DELETE ON products
+        BEGIN
+            INSERT INTO products_fts(products_fts, rowid, name, brand)
+            VALUES ('delete', old.id, old.name, old.brand);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER products_fts_au
+        AFTER UPDATE OF name, brand ON products
+        BEGIN
+            INSERT INTO products_fts(products_fts, rowid, name, brand)
+            VALUES ('delete', old.id, old.name, old.brand);
+            INSERT INTO products_fts(rowid, name, brand)
+            VALUES (new.id, new.name, new.brand);
+        END
+    """)
+    op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS products_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS products_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS products_fts_ai')
+    op.execute('DROP TABLE IF EXISTS products_fts')
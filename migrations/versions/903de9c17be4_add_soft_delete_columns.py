@@ -0,0 +1,224 @@
+"""add soft delete columns
+
+Revision ID: 903de9c17be4
+Revises: 26ab61a15abd
+Create Date: 2026-10-18 07:40:45.717736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '903de9c17be4'
+down_revision: Union[str, None] = '26ab61a15abd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Dropping the unique constraint on products.name rebuilds the table, which
+# drops every trigger on it, so they are all recreated afterwards.
+PRODUCT_TRIGGERS = (
+    'products_fts_ai',
+    'products_fts_ad',
+    'products_fts_au',
+    'product_facets_ai',
+    'product_facets_ad',
+    'product_facets_au',
+    'product_facets_soft_delete',
+    'product_facets_restore',
+    'product_tombstones_ad',
+    'product_tombstones_ai',
+    'product_tombstones_soft_delete',
+    'product_tombstones_restore',
+)
+
+FACETS_INCREMENT = """
+    INSERT INTO product_facets(facet, value, count)
+    VALUES ('type', new.type, 1),
+           ('brand', new.brand, 1),
+           ('price', CAST(CAST(new.price / 50 AS INTEGER) * 50 AS TEXT), 1)
+    ON CONFLICT(facet, value) DO UPDATE SET count = count + 1;
+"""
+
+FACETS_DECREMENT = """
+    UPDATE product_facets SET count = count - 1
+    WHERE (facet = 'type' AND value = old.type)
+       OR (facet = 'brand' AND value = old.brand)
+       OR (facet = 'price' AND value = CAST(CAST(old.price / 50 AS INTEGER) * 50 AS TEXT));
+"""
+
+FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER products_fts_ai AFTER INSERT ON products
+    BEGIN
+        INSERT INTO products_fts(rowid, name, brand)
+        VALUES (new.id, new.name, new.brand);
+    END
+    """,
+    """
+    CREATE TRIGGER products_fts_ad AFTER DELETE ON products
+    BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, brand)
+        VALUES ('delete', old.id, old.name, old.brand);
+    END
+    """,
+    """
+    CREATE TRIGGER products_fts_au
+    AFTER UPDATE OF name, brand ON products
+    BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, brand)
+        VALUES ('delete', old.id, old.name, old.brand);
+        INSERT INTO products_fts(rowid, name, brand)
+        VALUES (new.id, new.name, new.brand);
+    END
+    """,
+)
+
+TOMBSTONES_AI = """
+    CREATE TRIGGER product_tombstones_ai AFTER INSERT ON products
+    BEGIN
+        DELETE FROM product_tombstones WHERE product_id = new.id;
+    END
+"""
+
+SOFT_DELETE_TRIGGERS = (
+    f"""
+    CREATE TRIGGER product_facets_ai AFTER INSERT ON products
+    BEGIN {FACETS_INCREMENT} END
+    """,
+    f"""
+    CREATE TRIGGER product_facets_ad AFTER DELETE ON products
+    WHEN old.deleted_at IS NULL
+    BEGIN {FACETS_DECREMENT} END
+    """,
+    f"""
+    CREATE TRIGGER product_facets_au
+    AFTER UPDATE OF type, brand, price ON products
+    WHEN old.deleted_at IS NULL AND new.deleted_at IS NULL
+    BEGIN {FACETS_DECREMENT} {FACETS_INCREMENT} END
+    """,
+    f"""
+    CREATE TRIGGER product_facets_soft_delete
+    AFTER UPDATE OF deleted_at ON products
+    WHEN old.deleted_at IS NULL AND new.deleted_at IS NOT NULL
+    BEGIN {FACETS_DECREMENT} END
+    """,
+    f"""
+    CREATE TRIGGER product_facets_restore
+    AFTER UPDATE OF deleted_at ON products
+    WHEN old.deleted_at IS NOT NULL AND new.deleted_at IS NULL
+    BEGIN {FACETS_INCREMENT} END
+    """,
+    """
+    CREATE TRIGGER product_tombstones_ad AFTER DELETE ON products
+    BEGIN
+        INSERT INTO product_tombstones(product_id, deleted_at)
+        VALUES (old.id, CURRENT_TIMESTAMP)
+        ON CONFLICT(product_id) DO NOTHING;
+    END
+    """,
+    TOMBSTONES_AI,
+    """
+    CREATE TRIGGER product_tombstones_soft_delete
+    AFTER UPDATE OF deleted_at ON products
+    WHEN old.deleted_at IS NULL AND new.deleted_at IS NOT NULL
+    BEGIN
+        INSERT INTO product_tombstones(product_id, deleted_at)
+        VALUES (new.id, CURRENT_TIMESTAMP)
+        ON CONFLICT(product_id) DO UPDATE SET deleted_at = excluded.deleted_at;
+    END
+    """,
+    """
+    CREATE TRIGGER product_tombstones_restore
+    AFTER UPDATE OF deleted_at ON products
+    WHEN old.deleted_at IS NOT NULL AND new.deleted_at IS NULL
+    BEGIN
+        DELETE FROM product_tombstones WHERE product_id = new.id;
+    END
+    """,
+)
+
+HARD_DELETE_TRIGGERS = (
+    f"""
+    CREATE TRIGGER product_facets_ai AFTER INSERT ON products
+    BEGIN {FACETS_INCREMENT} END
+    """,
+    f"""
+    CREATE TRIGGER product_facets_ad AFTER DELETE ON products
+    BEGIN {FACETS_DECREMENT} END
+    """,
+    f"""
+    CREATE TRIGGER product_facets_au
+    AFTER UPDATE OF type, brand, price ON products
+    BEGIN {FACETS_DECREMENT} {FACETS_INCREMENT} END
+    """,
+    """
+    CREATE TRIGGER product_tombstones_ad AFTER DELETE ON products
+    BEGIN
+        INSERT INTO product_tombstones(product_id, deleted_at)
+        VALUES (old.id, CURRENT_TIMESTAMP)
+        ON CONFLICT(product_id) DO UPDATE SET deleted_at = excluded.deleted_at;
+    END
+    """,
+    TOMBSTONES_AI,
+)
+
+
+def drop_product_triggers() -> None:
+    for trigger in PRODUCT_TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    drop_product_triggers()
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.drop_constraint(batch_op.f('products_name_uk'), type_='unique')
+        batch_op.create_index('ix_products_deleted_at', ['deleted_at'], unique=False, sqlite_where=sa.text('deleted_at IS NOT NULL'))
+        batch_op.create_index('ix_products_name', ['name'], unique=True, sqlite_where=sa.text('deleted_at IS NULL'))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_users_deleted_at', ['deleted_at'], unique=False, sqlite_where=sa.text('deleted_at IS NOT NULL'))
+
+    # ### end Alembic commands ###
+
+    for statement in (*FTS_TRIGGERS, *SOFT_DELETE_TRIGGERS):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_product_triggers()
+
+    # Soft deleted rows cannot be represented without the column, and
+    # could collide with live product names, so they are purged first.
+    op.execute("""
+        DELETE FROM products_users
+        WHERE product_id IN (SELECT id FROM products WHERE deleted_at IS NOT NULL)
+           OR user_id IN (SELECT id FROM users WHERE deleted_at IS NOT NULL)
+    """)
+    op.execute('DELETE FROM products WHERE deleted_at IS NOT NULL')
+    op.execute('DELETE FROM users WHERE deleted_at IS NOT NULL')
+
+    # Batch mode would rebuild users and trip over its generated columns,
+    # so the column is dropped in place.
+    op.drop_index('ix_users_deleted_at', table_name='users', sqlite_where=sa.text('deleted_at IS NOT NULL'))
+    op.drop_column('users', 'deleted_at')
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index('ix_products_name', sqlite_where=sa.text('deleted_at IS NULL'))
+        batch_op.drop_index('ix_products_deleted_at', sqlite_where=sa.text('deleted_at IS NOT NULL'))
+        batch_op.create_unique_constraint(batch_op.f('products_name_uk'), ['name'])
+        batch_op.drop_column('deleted_at')
+
+    # ### end Alembic commands ###
+
+    for statement in (*FTS_TRIGGERS, *HARD_DELETE_TRIGGERS):
+        op.execute(statement)
@@ -14,7 +14,25 @@ from fastapi_products_api.models.product_user import ProductUser
 from fastapi_products_api.models.products import Product
 from fastapi_products_api.models.users import User
 from fastapi_products_api.registry import table_registry
-from fastapi_products_api.security import get_password_hash
+from fastapi_products_api.routers.inventory import summary_cache
+from fastapi_products_api.security import (
+    get_password_hash,
+    principal_cache,
+    token_revocations,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_principal_cache():
+    yield
+    principal_cache.clear()
+    token_revocations.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_summary_cache():
+    yield
+    summary_cache.clear()
 
 
 @pytest.fixture
@@ -5,3 +5,13 @@ def test_read_index_should_return_ok(client):
     response = client.get('/')
 
     assert response.status_code == HTTPStatus.OK
+
+
+def test_openapi_list_responses_should_keep_response_models(client):
+    paths = client.get('/openapi.json').json()['paths']
+
+    schema = paths['/products/']['get']['responses']['200']['content'][
+        'application/json'
+    ]['schema']
+
+    assert schema == {'$ref': '#/components/schemas/ProductsResponse'}
@@ -28,3 +28,15 @@ def test_login_for_access_token_should_have_token_type(client, user):
     token = response.json()
 
     assert 'token_type' in token
+
+
+def test_login_for_access_token_should_ignore_username_case(client, user):
+    response = client.post(
+        '/auth/token',
+        data={
+            'username': user.username.upper(),
+            'password': user.plain_password,
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
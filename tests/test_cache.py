@@ -0,0 +1,107 @@
+from time import time
+
+from fastapi_products_api.cache import (
+    PrincipalCache,
+    TokenRevocations,
+    TTLCache,
+)
+
+
+def test_principal_cache_should_count_hits_and_misses():
+    cache = PrincipalCache(maxsize=2, ttl=60)
+    cache.set('token', 'user', 'principal', time() + 60)
+
+    assert cache.get('token') == 'principal'
+    assert cache.get('other-token') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 1}
+
+
+def test_principal_cache_should_evict_least_recently_used():
+    cache = PrincipalCache(maxsize=2, ttl=60)
+    cache.set('token-1', 'user-1', 'principal-1', time() + 60)
+    cache.set('token-2', 'user-2', 'principal-2', time() + 60)
+    cache.get('token-1')
+    cache.set('token-3', 'user-3', 'principal-3', time() + 60)
+
+    assert cache.get('token-1') == 'principal-1'
+    assert cache.get('token-2') is None
+
+
+def test_principal_cache_should_expire_with_token():
+    cache = PrincipalCache(maxsize=2, ttl=60)
+    cache.set('token', 'user', 'principal', time() - 1)
+
+    assert cache.get('token') is None
+    assert len(cache) == 0
+
+
+def test_principal_cache_invalidate_should_drop_every_user_token():
+    cache = PrincipalCache(maxsize=4, ttl=60)
+    cache.set('token-1', 'user', 'principal', time() + 60)
+    cache.set('token-2', 'user', 'principal', time() + 60)
+    cache.set('token-3', 'other-user', 'other-principal', time() + 60)
+
+    cache.invalidate('user')
+
+    assert cache.get('token-1') is None
+    assert cache.get('token-2') is None
+    assert cache.get('token-3') == 'other-principal'
+
+
+def test_principal_cache_should_be_disabled_with_zero_size():
+    cache = PrincipalCache(maxsize=0, ttl=60)
+    cache.set('token', 'user', 'principal', time() + 60)
+
+    assert cache.get('token') is None
+
+
+def test_ttl_cache_should_expire_entries(monkeypatch):
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('key', 'value')
+
+    assert cache.get('key') == 'value'
+
+    monkeypatch.setattr('fastapi_products_api.cache.time', lambda: time() + 61)
+
+    assert cache.get('key') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 0}
+
+
+def test_ttl_cache_should_evict_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('key-1', 'value-1')
+    cache.set('key-2', 'value-2')
+    cache.get('key-1')
+    cache.set('key-3', 'value-3')
+
+    assert cache.get('key-1') == 'value-1'
+    assert cache.get('key-2') is None
+
+
+def test_ttl_cache_invalidate_should_drop_entry():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('key', 'value')
+
+    cache.invalidate('key')
+
+    assert cache.get('key') is None
+
+
+def test_token_revocations_should_keep_highest_version():
+    revocations = TokenRevocations(ttl=60)
+    token_version = 2
+    revocations.revoke(1, token_version)
+    revocations.revoke(1, token_version - 1)
+
+    assert revocations.min_version(1) == token_version
+    assert revocations.min_version(2) == 0
+
+
+def test_token_revocations_should_expire_with_tokens(monkeypatch):
+    revocations = TokenRevocations(ttl=60)
+    revocations.revoke(1, 1)
+
+    monkeypatch.setattr('fastapi_products_api.cache.time', lambda: time() + 61)
+
+    assert revocations.min_version(1) == 0
+    assert len(revocations) == 0
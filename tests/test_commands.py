@@ -0,0 +1,22 @@
+import pytest
+from sqlalchemy import delete, select
+
+from fastapi_products_api.commands import rebuild_product_facets
+from fastapi_products_api.models.facets import ProductFacet
+
+
+@pytest.mark.asyncio
+async def test_rebuild_product_facets_should_repair_drift(session, product):
+    await session.execute(delete(ProductFacet))
+
+    await rebuild_product_facets(session)
+
+    facets = await session.execute(
+        select(ProductFacet.facet, ProductFacet.value, ProductFacet.count)
+    )
+
+    assert set(facets) == {
+        ('type', 'TOYS_AND_GAMES', 1),
+        ('brand', 'test-brand', 1),
+        ('price', '250', 1),
+    }
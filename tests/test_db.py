@@ -36,6 +36,7 @@ async def test_create_product(session, mock_db_time):
         'type': ProductType.GROCERIES,
         'created_at': time,
         'updated_at': time,
+        'deleted_at': None,
     }
 
 
@@ -61,8 +62,12 @@ async def test_create_user(session, mock_db_time):
         'email': 'admin@test.com',
         'password': 'secret',
         'is_superuser': True,
+        'token_version': 0,
         'created_at': time,
         'updated_at': time,
+        'deleted_at': None,
+        'username_normalized': 'admin0test',
+        'email_normalized': 'admin@test.com',
     }
 
 
@@ -88,4 +93,6 @@ async def test_create_inventory(session, user, product, mock_db_time):
         'quantity': 1,
         'created_at': time,
         'updated_at': time,
+        'reserved': 0,
+        'version': 1,
     }
@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+
+from fastapi_products_api.hashing import PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    password_hasher = PasswordHasher(max_workers=1, max_pending=4, timeout=5)
+
+    yield password_hasher
+
+    password_hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_hash_should_verify(hasher):
+    hashed_password = await hasher.hash('secret')
+
+    assert await hasher.verify('secret', hashed_password)
+    assert not await hasher.verify('not-secret', hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_should_reject_when_busy(hasher):
+    hasher.max_pending = 0
+
+    with pytest.raises(HTTPException) as exc_info:
+        await hasher.hash('secret')
+
+    assert exc_info.value.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_should_reject_on_timeout(hasher):
+    hasher.timeout = 0
+
+    with pytest.raises(HTTPException) as exc_info:
+        await hasher.hash('secret')
+
+    assert exc_info.value.detail == 'Password hashing timed out'
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_hash_many_should_keep_order():
+    hasher = PasswordHasher(max_workers=2, max_pending=4, timeout=5)
+
+    try:
+        hashed_passwords = await hasher.hash_many(['first', 'second', 'third'])
+
+        assert [
+            await hasher.verify(password, hashed_password)
+            for password, hashed_password in zip(
+                ['first', 'second', 'third'], hashed_passwords
+            )
+        ] == [True, True, True]
+
+    finally:
+        hasher.shutdown()
@@ -1,13 +1,36 @@
 from http import HTTPStatus
 
-from fastapi_products_api.models.product_user import ProductUser
+import pytest_asyncio
+
+from fastapi_products_api.models.enums import ProductType
+from fastapi_products_api.models.products import Product
+from fastapi_products_api.routers.inventory import settings, summary_cache
 from fastapi_products_api.schemas.inventory import (
+    ResponseUserInventoryAddProduct,
     ResponseUserInventoryReadList,
     ResponseUserInventoryReadProduct,
     ResponseUserInventoryUpdateProductQuantity,
 )
 
 
+@pytest_asyncio.fixture
+async def extra_products(session):
+    products = [
+        Product(
+            name=f'extra-product-{index}',
+            brand='test-brand',
+            price=10.0,
+            type=ProductType.BOOKS,
+        )
+        for index in range(2)
+    ]
+
+    session.add_all(products)
+    await session.commit()
+
+    return products
+
+
 def test_add_product_to_user_inventory_should_return_created(
     client, product, token
 ):
@@ -21,21 +44,74 @@ def test_add_product_to_user_inventory_should_return_created(
 
 
 def test_add_product_to_user_inventory_should_return_ResponseSchema(
-    client, user, product, token, mock_db_time
+    client, user, product, token
 ):
-    with mock_db_time(model=ProductUser) as time:
-        response = client.post(
-            '/inventory',
-            json={'product_id': product.id, 'quantity': 5},
-            headers={'Authorization': f'Bearer {token}'},
-        )
+    response = client.post(
+        '/inventory',
+        json={'product_id': product.id, 'quantity': 5},
+        headers={'Authorization': f'Bearer {token}'},
+    )
 
-    assert response.json() == {
+    inventory_data = ResponseUserInventoryAddProduct.model_validate(
+        response.json()
+    )
+
+    assert inventory_data.model_dump(include={'product_id', 'quantity'}) == {
         'product_id': product.id,
         'quantity': 5,
-        'created_at': time.isoformat(),
-        'updated_at': time.isoformat(),
     }
+    assert inventory_data.created_at == inventory_data.updated_at
+
+
+def test_add_product_to_user_inventory_should_increment_held_quantity(
+    client, product, token, inventory
+):
+    response = client.post(
+        '/inventory',
+        json={'product_id': product.id, 'quantity': 3},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json()['quantity'] == inventory.quantity + 3
+
+
+def test_add_product_to_user_inventory_should_reject_negative_quantity(
+    client, product, token, inventory
+):
+    response = client.post(
+        '/inventory',
+        json={'product_id': product.id, 'quantity': -10},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_add_product_to_user_inventory_should_reject_null_quantity(
+    client, product, token
+):
+    response = client.post(
+        '/inventory',
+        json={'product_id': product.id, 'quantity': None},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_add_product_to_user_inventory_should_skip_deleted_products(
+    client, product, token
+):
+    client.delete(f'/products/{product.id}')
+
+    response = client.post(
+        '/inventory',
+        json={'product_id': product.id},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
 
 
 def test_add_product_to_user_inventory_should_return_not_found(client, token):
@@ -145,3 +221,515 @@ def test_update_product_inventory_quantity_should_return_inventory(
     )
 
     assert response.json() == inventory_schema
+
+
+def test_update_product_inventory_quantity_should_return_not_found(
+    client, token, product
+):
+    response = client.patch(
+        '/inventory',
+        json={'product_id': product.id, 'quantity': 5},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_read_product_inventory_list_should_return_requested_fields_only(
+    client, token, product, inventory
+):
+    response = client.get(
+        '/inventory',
+        params={'fields': 'product_id,quantity'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.json() == {
+        'products': [{'product_id': product.id, 'quantity': 2}],
+        'next_cursor': None,
+    }
+
+
+def test_read_product_inventory_list_should_skip_deleted_products(
+    client, token, product, inventory
+):
+    client.delete(f'/products/{product.id}')
+
+    response = client.get(
+        '/inventory', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.json()['products'] == []
+
+
+def test_apply_inventory_batch_should_apply_every_operation(
+    client, token, product, inventory, extra_products
+):
+    first, second = extra_products
+
+    response = client.post(
+        '/inventory/batch',
+        json={
+            'operations': [
+                {'op': 'delta', 'product_id': product.id, 'quantity': -1},
+                {'op': 'add', 'product_id': first.id, 'quantity': 3},
+                {'op': 'set', 'product_id': second.id, 'quantity': 7},
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [
+        (item['product_id'], item['quantity'])
+        for item in response.json()['products']
+    ] == [(product.id, 1), (first.id, 3), (second.id, 7)]
+
+
+def test_apply_inventory_batch_should_accumulate_adds_and_overwrite_sets(
+    client, token, product, inventory, extra_products
+):
+    first, _ = extra_products
+    expected = {
+        'product_id': product.id,
+        'name': product.name,
+        'brand': product.brand,
+        'price': float(product.price),
+        'type': product.type,
+        'quantity': 5,
+    }
+
+    response = client.post(
+        '/inventory/batch',
+        json={
+            'operations': [
+                {'op': 'add', 'product_id': product.id, 'quantity': 3},
+                {'op': 'set', 'product_id': first.id, 'quantity': 4},
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert [item['quantity'] for item in response.json()['products']] == [
+        5,
+        4,
+    ]
+    assert response.json()['products'][0] == expected
+
+
+def test_apply_inventory_batch_should_roll_back_when_a_delta_goes_negative(
+    client, token, product, inventory, extra_products
+):
+    first, _ = extra_products
+    product_id = product.id
+
+    response = client.post(
+        '/inventory/batch',
+        json={
+            'operations': [
+                {'op': 'add', 'product_id': first.id, 'quantity': 3},
+                {'op': 'delta', 'product_id': product_id, 'quantity': -3},
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json() == {
+        'detail': f'Insufficient quantity for products: {product_id}'
+    }
+
+    response = client.get(
+        '/inventory', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert [
+        (item['product_id'], item['quantity'])
+        for item in response.json()['products']
+    ] == [(product_id, 2)]
+
+
+def test_apply_inventory_batch_should_return_not_found(
+    client, token, product, inventory
+):
+    response = client.post(
+        '/inventory/batch',
+        json={
+            'operations': [
+                {'op': 'add', 'product_id': product.id},
+                {'op': 'add', 'product_id': 999},
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Products not found: 999'}
+
+
+def test_apply_inventory_batch_should_reject_delta_on_product_not_held(
+    client, token, product
+):
+    response = client.post(
+        '/inventory/batch',
+        json={
+            'operations': [
+                {'op': 'delta', 'product_id': product.id, 'quantity': 1}
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {
+        'detail': f'Products not in inventory: {product.id}'
+    }
+
+
+def test_apply_inventory_batch_should_reject_duplicate_products(
+    client, token, product
+):
+    response = client.post(
+        '/inventory/batch',
+        json={
+            'operations': [
+                {'op': 'add', 'product_id': product.id},
+                {'op': 'set', 'product_id': product.id, 'quantity': 2},
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_apply_inventory_batch_should_reject_negative_set(
+    client, token, product
+):
+    response = client.post(
+        '/inventory/batch',
+        json={
+            'operations': [
+                {'op': 'set', 'product_id': product.id, 'quantity': -1}
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_apply_inventory_batch_should_reject_zero_add(client, token, product):
+    response = client.post(
+        '/inventory/batch',
+        json={
+            'operations': [
+                {'op': 'add', 'product_id': product.id, 'quantity': 0}
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert (
+        client.get(
+            '/inventory', headers={'Authorization': f'Bearer {token}'}
+        ).json()['products']
+        == []
+    )
+
+
+def test_apply_inventory_batch_should_limit_operations(
+    client, token, product, monkeypatch
+):
+    monkeypatch.setattr(settings, 'INVENTORY_BATCH_MAX_ITEMS', 0)
+
+    response = client.post(
+        '/inventory/batch',
+        json={'operations': [{'op': 'add', 'product_id': product.id}]},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+def test_update_product_inventory_quantity_should_reject_negative_quantity(
+    client, token, product, inventory
+):
+    response = client.patch(
+        '/inventory',
+        json={'product_id': product.id, 'quantity': -4},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_update_product_inventory_quantity_should_apply_delta(
+    client, token, product, inventory
+):
+    response = client.patch(
+        '/inventory',
+        json={'product_id': product.id, 'delta': -2},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['quantity'] == 0
+
+
+def test_update_product_inventory_quantity_should_keep_delta_above_zero(
+    client, token, product, inventory
+):
+    response = client.patch(
+        '/inventory',
+        json={'product_id': product.id, 'delta': -3},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
+def test_update_product_inventory_quantity_delta_should_return_not_found(
+    client, token, product
+):
+    response = client.patch(
+        '/inventory',
+        json={'product_id': product.id, 'delta': 1},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_update_product_inventory_quantity_should_require_one_change(
+    client, token, product, inventory
+):
+    response = client.patch(
+        '/inventory',
+        json={'product_id': product.id, 'quantity': 1, 'delta': 1},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_read_inventory_summary_should_aggregate_by_type(
+    client, token, product, inventory, extra_products
+):
+    first, second = extra_products
+    client.post(
+        '/inventory/batch',
+        json={
+            'operations': [
+                {'op': 'add', 'product_id': first.id, 'quantity': 3},
+                {'op': 'add', 'product_id': second.id, 'quantity': 1},
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    response = client.get(
+        '/inventory/summary', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'products': 3,
+        'items': 6,
+        'value': 639.98,
+        'types': [
+            {'type': 'books', 'products': 2, 'items': 4, 'value': 40.0},
+            {
+                'type': 'toys_and_games',
+                'products': 1,
+                'items': 2,
+                'value': 599.98,
+            },
+        ],
+    }
+
+
+def test_read_inventory_summary_should_return_zeroes_for_empty_inventory(
+    client, token
+):
+    response = client.get(
+        '/inventory/summary', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.json() == {
+        'products': 0,
+        'items': 0,
+        'value': 0,
+        'types': [],
+    }
+
+
+def test_read_inventory_summary_cached_should_drop_on_inventory_write(
+    client, token, product, inventory
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    held = inventory.quantity
+    client.get('/inventory/summary?cached=true', headers=headers)
+
+    client.patch(
+        '/inventory',
+        json={'product_id': product.id, 'delta': 1},
+        headers=headers,
+    )
+
+    response = client.get('/inventory/summary?cached=true', headers=headers)
+
+    assert response.json()['items'] == held + 1
+    assert summary_cache.stats()['hits'] == 0
+
+
+def test_read_inventory_summary_cached_should_reuse_summary(
+    client, token, product, inventory
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/inventory/summary?cached=true', headers=headers)
+
+    response = client.get('/inventory/summary?cached=true', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert summary_cache.stats()['hits'] == 1
+
+
+def test_read_product_inventory_by_product_id_should_return_version_etag(
+    client, token, product, inventory
+):
+    response = client.get(
+        f'/inventory/{product.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.headers['ETag'] == '"1"'
+
+
+def test_update_product_inventory_quantity_should_honour_if_match(
+    client, token, product, inventory
+):
+    response = client.patch(
+        '/inventory',
+        json={'product_id': product.id, 'quantity': 5},
+        headers={'Authorization': f'Bearer {token}', 'If-Match': '"1"'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] == '"2"'
+    assert response.headers['ETag'] == f'"{response.json()["version"]}"'
+
+
+def test_update_product_inventory_quantity_should_reject_stale_version(
+    client, token, product, inventory
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.patch(
+        '/inventory',
+        json={'product_id': product.id, 'delta': 1},
+        headers=headers,
+    )
+
+    response = client.patch(
+        '/inventory',
+        json={'product_id': product.id, 'quantity': 5, 'expected_version': 1},
+        headers=headers,
+    )
+
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+    assert response.headers['ETag'] == '"2"'
+
+
+def test_update_product_inventory_quantity_should_reject_invalid_if_match(
+    client, token, product, inventory
+):
+    response = client.patch(
+        '/inventory',
+        json={'product_id': product.id, 'quantity': 5},
+        headers={'Authorization': f'Bearer {token}', 'If-Match': 'W/"1"'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_reserve_inventory_should_move_quantity_to_reserved(
+    client, token, product, inventory
+):
+    response = client.post(
+        '/inventory/reservations/reserve',
+        json={'product_id': product.id, 'quantity': 2},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'product_id': product.id,
+        'quantity': 0,
+        'reserved': 2,
+        'version': 2,
+    }
+
+
+def test_reserve_inventory_should_not_go_below_zero(
+    client, token, product, inventory
+):
+    response = client.post(
+        '/inventory/reservations/reserve',
+        json={'product_id': product.id, 'quantity': 3},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json() == {'detail': 'Insufficient quantity to reserve'}
+
+
+def test_consume_and_release_inventory_should_drain_reserved(
+    client, token, product, inventory
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post(
+        '/inventory/reservations/reserve',
+        json={'product_id': product.id, 'quantity': 2},
+        headers=headers,
+    )
+    client.post(
+        '/inventory/reservations/consume',
+        json={'product_id': product.id},
+        headers=headers,
+    )
+
+    response = client.post(
+        '/inventory/reservations/release',
+        json={'product_id': product.id},
+        headers={**headers, 'If-Match': '"3"'},
+    )
+
+    assert response.json() == {
+        'product_id': product.id,
+        'quantity': 1,
+        'reserved': 0,
+        'version': 4,
+    }
+
+
+def test_consume_inventory_should_require_reserved_units(
+    client, token, product, inventory
+):
+    response = client.post(
+        '/inventory/reservations/consume',
+        json={'product_id': product.id},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
+def test_reserve_inventory_should_return_not_found(client, token, product):
+    response = client.post(
+        '/inventory/reservations/reserve',
+        json={'product_id': product.id},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
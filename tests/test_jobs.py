@@ -0,0 +1,51 @@
+import pytest
+
+from fastapi_products_api.jobs import JobRegistry
+
+
+async def _fail():
+    raise ValueError('boom')
+
+
+async def _succeed():
+    return 'done'
+
+
+@pytest.mark.asyncio
+async def test_job_registry_run_should_record_result():
+    registry = JobRegistry(maxsize=2)
+    job = registry.create(total=1)
+
+    await registry.run(job['id'], _succeed)
+
+    assert registry.get(job['id']) == {
+        'id': job['id'],
+        'status': 'completed',
+        'result': 'done',
+        'detail': None,
+        'total': 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_job_registry_run_should_record_failure():
+    registry = JobRegistry(maxsize=2)
+    job = registry.create()
+
+    await registry.run(job['id'], _fail)
+
+    assert job['status'] == 'failed'
+    assert job['detail'] == 'boom'
+
+
+@pytest.mark.asyncio
+async def test_job_registry_should_evict_oldest_finished_jobs():
+    registry = JobRegistry(maxsize=1)
+    finished = registry.create()
+    await registry.run(finished['id'], _succeed)
+    pending = registry.create()
+    newest = registry.create()
+
+    assert registry.get(finished['id']) is None
+    assert registry.get(pending['id']) is pending
+    assert registry.get(newest['id']) is newest
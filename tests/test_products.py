@@ -1,8 +1,17 @@
+import json
 from http import HTTPStatus
 
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
 from fastapi_products_api.models.enums import ProductType
 from fastapi_products_api.models.products import Product
-from fastapi_products_api.schemas.products import ProductResponse
+from fastapi_products_api.registry import table_registry
+from fastapi_products_api.routers.products import export_products, settings
+from fastapi_products_api.schemas.products import (
+    FilterExport,
+    ProductResponse,
+)
 
 
 def test_create_product_should_return_created(client):
@@ -64,14 +73,17 @@ def test_read_products_should_return_ok(client):
 def test_read_products_should_return_empty_product_list(client):
     response = client.get('/products')
 
-    assert response.json() == {'products': []}
+    assert response.json() == {'products': [], 'next_cursor': None}
 
 
 def test_read_products_should_return_product_list(client, product):
     product_schema = ProductResponse.model_validate(product).model_dump()
     response = client.get('/products')
 
-    assert response.json() == {'products': [product_schema]}
+    assert response.json() == {
+        'products': [product_schema],
+        'next_cursor': None,
+    }
 
 
 def test_read_product_should_return_ok(client, product):
@@ -201,3 +213,826 @@ def test_delete_product_should_return_not_found(client):
     response = client.delete('/products/1')
 
     assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_read_products_should_follow_next_cursor(client):
+    for index in range(3):
+        client.post(
+            '/products',
+            json={
+                'name': f'test-product-{index}',
+                'brand': 'test-brand',
+                'price': 9.99,
+                'type': ProductType.BOOKS,
+            },
+        )
+
+    first_page = client.get('/products', params={'limit': 2}).json()
+    second_page = client.get(
+        '/products', params={'limit': 2, 'cursor': first_page['next_cursor']}
+    ).json()
+
+    assert [product['id'] for product in first_page['products']] == [1, 2]
+    assert [product['id'] for product in second_page['products']] == [3]
+    assert second_page['next_cursor'] is None
+
+
+def test_read_products_should_return_bad_request_for_invalid_cursor(client):
+    response = client.get('/products', params={'cursor': 'not-a-cursor'})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_read_products_should_filter_by_type_and_price(client):
+    for index, (product_type, price) in enumerate([
+        (ProductType.BOOKS, 10),
+        (ProductType.BOOKS, 50),
+        (ProductType.CLOTHING, 20),
+    ]):
+        client.post(
+            '/products',
+            json={
+                'name': f'test-product-{index}',
+                'brand': 'test-brand',
+                'price': price,
+                'type': product_type,
+            },
+        )
+
+    response = client.get(
+        '/products',
+        params={'type': ProductType.BOOKS, 'max_price': 20},
+    )
+
+    assert [product['name'] for product in response.json()['products']] == [
+        'test-product-0'
+    ]
+
+
+def test_read_products_should_sort_by_price_descending(client):
+    for index, price in enumerate([10, 30, 20]):
+        client.post(
+            '/products',
+            json={
+                'name': f'test-product-{index}',
+                'brand': 'test-brand',
+                'price': price,
+                'type': ProductType.BOOKS,
+            },
+        )
+
+    first_page = client.get(
+        '/products', params={'sort': '-price', 'limit': 2}
+    ).json()
+    second_page = client.get(
+        '/products',
+        params={
+            'sort': '-price',
+            'limit': 2,
+            'cursor': first_page['next_cursor'],
+        },
+    ).json()
+
+    prices = [
+        product['price']
+        for page in (first_page, second_page)
+        for product in page['products']
+    ]
+
+    assert prices == [30, 20, 10]
+
+
+def test_search_products_should_match_name_and_brand(client):
+    for name, brand in [
+        ('wireless mouse', 'logitech'),
+        ('mechanical keyboard', 'logitech'),
+        ('coffee mug', 'acme'),
+    ]:
+        client.post(
+            '/products',
+            json={
+                'name': name,
+                'brand': brand,
+                'price': 19.99,
+                'type': ProductType.ELECTRONICS,
+            },
+        )
+
+    by_brand = client.get('/products/search', params={'q': 'logi'}).json()
+    by_name = client.get('/products/search', params={'q': 'mug'}).json()
+
+    assert {product['name'] for product in by_brand['products']} == {
+        'wireless mouse',
+        'mechanical keyboard',
+    }
+    assert [product['name'] for product in by_name['products']] == [
+        'coffee mug'
+    ]
+
+
+def test_search_products_should_follow_index_updates(client, product):
+    client.put(
+        f'/products/{product.id}',
+        json={
+            'name': 'renamed-product',
+            'brand': 'test-brand',
+            'price': 299.99,
+            'type': ProductType.TOYS_AND_GAMES,
+        },
+    )
+    client.delete(f'/products/{product.id}')
+
+    response = client.get('/products/search', params={'q': 'renamed'})
+
+    assert response.json()['products'] == []
+
+
+def test_search_products_should_paginate_with_cursor(client):
+    for index in range(3):
+        client.post(
+            '/products',
+            json={
+                'name': f'lamp {index}',
+                'brand': 'acme',
+                'price': 19.99,
+                'type': ProductType.HOME_AND_KITCHEN,
+            },
+        )
+
+    first_page = client.get(
+        '/products/search', params={'q': 'lamp', 'limit': 2}
+    ).json()
+    second_page = client.get(
+        '/products/search',
+        params={'q': 'lamp', 'limit': 2, 'cursor': first_page['next_cursor']},
+    ).json()
+
+    ids = [
+        product['id']
+        for page in (first_page, second_page)
+        for product in page['products']
+    ]
+
+    assert sorted(ids) == [1, 2, 3]
+
+
+def test_read_product_should_return_validators(client, product):
+    response = client.get(f'/products/{product.id}')
+
+    assert response.headers['ETag'].startswith('"')
+    assert response.headers['Last-Modified'].endswith('GMT')
+
+
+def test_read_product_should_return_not_modified_for_matching_etag(
+    client, product
+):
+    etag = client.get(f'/products/{product.id}').headers['ETag']
+
+    response = client.get(
+        f'/products/{product.id}', headers={'If-None-Match': etag}
+    )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert not response.content
+
+
+def test_read_product_should_return_ok_after_update(client, product):
+    etag = client.get(f'/products/{product.id}').headers['ETag']
+    client.put(
+        f'/products/{product.id}',
+        json={
+            'name': 'test-product',
+            'brand': 'test-brand',
+            'price': 1.99,
+            'type': ProductType.TOYS_AND_GAMES,
+        },
+    )
+
+    response = client.get(
+        f'/products/{product.id}', headers={'If-None-Match': etag}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_read_products_should_return_not_modified_for_matching_etag(
+    client, product
+):
+    etag = client.get('/products').headers['ETag']
+
+    response = client.get('/products', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_read_products_should_return_ok_after_delete(client, product):
+    client.post(
+        '/products',
+        json={
+            'name': 'test-product-1',
+            'brand': 'test-brand',
+            'price': 9.99,
+            'type': ProductType.BOOKS,
+        },
+    )
+    listed = client.get('/products')
+    client.delete(f'/products/{product.id}')
+
+    assert 'Last-Modified' not in listed.headers
+
+    for headers in (
+        {'If-None-Match': listed.headers['ETag']},
+        {'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'},
+    ):
+        response = client.get('/products', headers=headers)
+
+        assert response.status_code == HTTPStatus.OK
+        assert [item['name'] for item in response.json()['products']] == [
+            'test-product-1'
+        ]
+
+
+def test_create_products_bulk_should_report_each_row(client, product):
+    response = client.post(
+        '/products/bulk',
+        json=[
+            {
+                'name': 'test-product-1',
+                'brand': 'test-brand',
+                'price': 9.99,
+                'type': ProductType.BOOKS,
+            },
+            {
+                'name': product.name,
+                'brand': 'test-brand',
+                'price': 9.99,
+                'type': ProductType.BOOKS,
+            },
+            {
+                'name': 'test-product-1',
+                'brand': 'test-brand',
+                'price': 9.99,
+                'type': ProductType.BOOKS,
+            },
+        ],
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'created': 1,
+        'conflicts': 2,
+        'results': [
+            {
+                'index': 0,
+                'name': 'test-product-1',
+                'status': 'created',
+                'id': 2,
+            },
+            {
+                'index': 1,
+                'name': product.name,
+                'status': 'conflict',
+                'id': None,
+            },
+            {
+                'index': 2,
+                'name': 'test-product-1',
+                'status': 'conflict',
+                'id': None,
+            },
+        ],
+    }
+
+
+def test_create_products_bulk_should_insert_in_batches(client, monkeypatch):
+    monkeypatch.setattr(settings, 'PRODUCT_BULK_BATCH_SIZE', 2)
+
+    client.post(
+        '/products/bulk',
+        json=[
+            {
+                'name': f'test-product-{index}',
+                'brand': 'test-brand',
+                'price': 9.99,
+                'type': ProductType.BOOKS,
+            }
+            for index in range(5)
+        ],
+    )
+
+    response = client.get('/products')
+
+    assert [product['name'] for product in response.json()['products']] == [
+        f'test-product-{index}' for index in range(5)
+    ]
+
+
+def test_create_products_bulk_should_reject_too_many_items(
+    client, monkeypatch
+):
+    monkeypatch.setattr(settings, 'PRODUCT_BULK_MAX_ITEMS', 1)
+
+    product = {
+        'name': 'test-product',
+        'brand': 'test-brand',
+        'price': 9.99,
+        'type': ProductType.BOOKS,
+    }
+    response = client.post('/products/bulk', json=[product, product])
+
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+def test_sync_products_should_report_inserted_updated_unchanged(
+    client, product
+):
+    response = client.put(
+        '/products/sync',
+        json=[
+            {
+                'name': product.name,
+                'brand': product.brand,
+                'price': float(product.price),
+                'type': product.type,
+            },
+            {
+                'name': 'test-product-1',
+                'brand': 'test-brand',
+                'price': 9.99,
+                'type': ProductType.BOOKS,
+            },
+        ],
+    )
+
+    assert response.json() == {'inserted': 1, 'updated': 0, 'unchanged': 1}
+
+    new_price = 19.99
+    response = client.put(
+        '/products/sync',
+        json=[
+            {
+                'name': 'test-product-1',
+                'brand': 'test-brand',
+                'price': new_price,
+                'type': ProductType.BOOKS,
+            },
+        ],
+    )
+
+    assert response.json() == {'inserted': 0, 'updated': 1, 'unchanged': 0}
+    assert client.get('/products/2').json()['price'] == new_price
+
+
+def test_export_products_should_stream_ndjson(client, product, monkeypatch):
+    monkeypatch.setattr(settings, 'EXPORT_CHUNK_SIZE', 1)
+    client.post(
+        '/products',
+        json={
+            'name': 'test-product-1',
+            'brand': 'test-brand',
+            'price': 9.99,
+            'type': ProductType.BOOKS,
+        },
+    )
+
+    response = client.get('/products/export')
+
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert [
+        json.loads(line)['name'] for line in response.text.splitlines()
+    ] == ['test-product', 'test-product-1']
+
+
+def test_export_products_should_stream_csv(client, product):
+    response = client.get('/products/export', params={'format': 'csv'})
+
+    assert response.headers['content-type'].startswith('text/csv')
+    assert response.text.splitlines() == [
+        'id,name,brand,price,type',
+        f'{product.id},test-product,test-brand,299.99,toys_and_games',
+    ]
+
+
+def test_import_products_should_stream_ndjson_report(
+    client, product, monkeypatch
+):
+    monkeypatch.setattr(settings, 'IMPORT_CHUNK_SIZE', 2)
+    body = '\n'.join([
+        json.dumps({
+            'name': 'test-product-1',
+            'brand': 'test-brand',
+            'price': 9.99,
+            'type': 'books',
+        }),
+        json.dumps({
+            'name': product.name,
+            'brand': 'test-brand',
+            'price': 9.99,
+            'type': 'books',
+        }),
+        '{not json',
+        json.dumps({'name': 'test-product-2', 'brand': 'test-brand'}),
+    ])
+
+    response = client.post('/products/import', content=body)
+    report = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [(entry['type'], entry.get('line')) for entry in report] == [
+        ('rejected', 2),
+        ('progress', None),
+        ('rejected', 3),
+        ('rejected', 4),
+        ('progress', None),
+        ('summary', None),
+    ]
+    assert report[-1] == {
+        'type': 'summary',
+        'processed': 4,
+        'inserted': 1,
+        'rejected': 3,
+    }
+
+
+def test_import_products_should_accept_exported_csv(client, product):
+    exported = client.get('/products/export', params={'format': 'csv'}).text
+    client.delete(f'/products/{product.id}')
+
+    response = client.post(
+        '/products/import', params={'format': 'csv'}, content=exported
+    )
+
+    assert json.loads(response.text.splitlines()[-1])['inserted'] == 1
+    assert client.get('/products').json()['products'][0]['name'] == (
+        product.name
+    )
+
+
+def test_import_products_should_reject_invalid_utf8(client):
+    body = b'\n'.join([
+        json.dumps({
+            'name': 'test-product-\xe9',
+            'brand': 'test-brand',
+            'price': 9.99,
+            'type': 'books',
+        }).encode(),
+        json
+        .dumps({
+            'name': 'test-product-2',
+            'brand': 'test-brand',
+            'price': 9.99,
+            'type': 'books',
+        })
+        .encode()
+        .replace(b'-2', b'-\xff'),
+    ])
+
+    response = client.post('/products/import', content=body)
+    report = [json.loads(line) for line in response.text.splitlines()]
+
+    assert report[0] == {
+        'type': 'rejected',
+        'line': 2,
+        'errors': [{'msg': 'Invalid UTF-8'}],
+    }
+    assert [
+        product['name']
+        for product in client.get('/products').json()['products']
+    ] == ['test-product-\xe9']
+
+
+def test_import_products_should_reject_invalid_utf8_csv(client):
+    body = (
+        b'name,brand,price,type\r\n'
+        b'test-product-1,test-brand,9.99,books\r\n'
+        b'"test-product-\xff\r\n2",test-brand,9.99,books\r\n'
+    )
+
+    response = client.post(
+        '/products/import', params={'format': 'csv'}, content=body
+    )
+    report = [json.loads(line) for line in response.text.splitlines()]
+
+    assert report[0] == {
+        'type': 'rejected',
+        'line': 4,
+        'errors': [{'msg': 'Invalid UTF-8'}],
+    }
+    assert report[-1]['inserted'] == 1
+
+
+def test_read_product_facets_should_follow_writes(client, product):
+    client.post(
+        '/products',
+        json={
+            'name': 'test-product-1',
+            'brand': 'test-brand',
+            'price': 10,
+            'type': ProductType.BOOKS,
+        },
+    )
+    client.put(
+        f'/products/{product.id}',
+        json={
+            'name': product.name,
+            'brand': 'other-brand',
+            'price': 20,
+            'type': ProductType.BOOKS,
+        },
+    )
+
+    response = client.get('/products/facets')
+
+    assert response.json() == {
+        'types': [{'value': 'books', 'count': 2}],
+        'brands': [
+            {'value': 'other-brand', 'count': 1},
+            {'value': 'test-brand', 'count': 1},
+        ],
+        'prices': [{'min_price': 0, 'max_price': 50, 'count': 2}],
+    }
+
+
+def test_read_products_should_return_requested_fields_only(client, product):
+    response = client.get('/products', params={'fields': 'id,price'})
+
+    assert response.json() == {
+        'products': [{'id': product.id, 'price': 299.99}],
+        'next_cursor': None,
+    }
+
+
+def test_read_product_should_return_requested_fields_only(client, product):
+    response = client.get(f'/products/{product.id}', params={'fields': 'name'})
+
+    assert response.json() == {'name': product.name}
+    assert 'ETag' in response.headers
+
+
+def test_read_products_should_reject_unknown_fields(client):
+    response = client.get('/products', params={'fields': 'id,secret'})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Unknown fields: secret'}
+
+
+def test_read_products_by_ids_should_keep_order_and_report_missing(client):
+    for name in ('first', 'second'):
+        client.post(
+            '/products',
+            json={
+                'name': name,
+                'brand': 'test-brand',
+                'price': 1,
+                'type': ProductType.BOOKS,
+            },
+        )
+
+    response = client.get('/products/batch', params={'ids': '2,99,1,2'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert [p['name'] for p in response.json()['products']] == [
+        'second',
+        'first',
+    ]
+    assert response.json()['missing'] == [99]
+
+
+def test_read_products_batch_post_should_resolve_ids(client, product):
+    response = client.post('/products/batch', json={'ids': [product.id]})
+
+    assert response.json() == {
+        'products': [
+            {
+                'id': product.id,
+                'name': 'test-product',
+                'brand': 'test-brand',
+                'price': 299.99,
+                'type': 'toys_and_games',
+            }
+        ],
+        'missing': [],
+    }
+
+
+def test_read_products_by_ids_should_reject_invalid_ids(client):
+    response = client.get('/products/batch', params={'ids': '1,abc'})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid product ids'}
+
+
+def test_read_products_batch_should_reject_too_many_ids(client, monkeypatch):
+    monkeypatch.setattr(settings, 'PRODUCT_BATCH_MAX_IDS', 1)
+
+    response = client.post('/products/batch', json={'ids': [1, 2]})
+
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+def test_read_product_changes_should_return_upserts_and_deletes(
+    client, product, monkeypatch
+):
+    monkeypatch.setattr(settings, 'CHANGES_SETTLE_SECONDS', 0)
+    new_product = client.post(
+        '/products',
+        json={
+            'name': 'new-product',
+            'brand': 'test-brand',
+            'price': 10,
+            'type': ProductType.BOOKS,
+        },
+    ).json()
+    client.delete(f'/products/{product.id}')
+
+    response = client.get('/products/changes')
+
+    changes = response.json()['changes']
+    assert response.status_code == HTTPStatus.OK
+    assert {(c['id'], c['deleted']) for c in changes} == {
+        (product.id, True),
+        (new_product['id'], False),
+    }
+    assert [c['product'] for c in changes if not c['deleted']] == [new_product]
+
+
+def test_read_product_changes_should_resume_from_cursor(
+    client, product, monkeypatch
+):
+    monkeypatch.setattr(settings, 'CHANGES_SETTLE_SECONDS', 0)
+
+    first = client.get('/products/changes').json()
+    second = client.get(
+        '/products/changes', params={'since': first['next_cursor']}
+    ).json()
+
+    assert [c['id'] for c in first['changes']] == [product.id]
+    assert second == {'changes': [], 'next_cursor': first['next_cursor']}
+
+
+def test_read_product_changes_should_hold_back_unsettled_rows(client, product):
+    response = client.get('/products/changes')
+
+    assert response.json() == {'changes': [], 'next_cursor': None}
+
+
+def test_read_product_changes_should_reject_invalid_cursor(client):
+    response = client.get('/products/changes', params={'since': 'invalid'})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_delete_product_should_hide_product_from_reads(client, product):
+    client.delete(f'/products/{product.id}')
+
+    assert client.get(f'/products/{product.id}').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    assert client.get('/products').json()['products'] == []
+    assert client.get('/products/facets').json()['types'] == []
+    assert client.delete(f'/products/{product.id}').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+def test_delete_product_should_free_its_name(client, product):
+    client.delete(f'/products/{product.id}')
+
+    response = client.post(
+        '/products',
+        json={
+            'name': product.name,
+            'brand': 'test-brand',
+            'price': 1,
+            'type': ProductType.BOOKS,
+        },
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json()['id'] != product.id
+
+
+def _add_holder(client, user, product_id, quantity):
+    token = client.post(
+        '/auth/token',
+        data={'username': user.username, 'password': user.plain_password},
+    ).json()['access_token']
+
+    client.post(
+        '/inventory',
+        json={'product_id': product_id, 'quantity': quantity},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+
+def test_read_product_holders_should_page_by_user(
+    client, product, user, other_user, inventory
+):
+    _add_holder(client, other_user, product.id, 5)
+
+    response = client.get(f'/products/{product.id}/holders?limit=1')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['holders'] == [
+        {'user_id': user.id, 'quantity': inventory.quantity}
+    ]
+
+    response = client.get(
+        f'/products/{product.id}/holders',
+        params={'limit': 1, 'cursor': response.json()['next_cursor']},
+    )
+
+    assert response.json()['holders'] == [
+        {'user_id': other_user.id, 'quantity': 5}
+    ]
+
+
+def test_read_product_holders_should_skip_deleted_users(
+    client, product, other_user, inventory, token
+):
+    _add_holder(client, other_user, product.id, 5)
+    client.delete(
+        f'/users/{inventory.user_id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    response = client.get(f'/products/{product.id}/holders')
+
+    assert response.json() == {
+        'holders': [{'user_id': other_user.id, 'quantity': 5}],
+        'next_cursor': None,
+    }
+
+
+def test_read_product_holders_should_return_not_found(client):
+    response = client.get('/products/999/holders')
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_count_product_holders_should_count_holders_and_items(
+    client, product, user, other_user, inventory
+):
+    _add_holder(client, other_user, product.id, 5)
+
+    response = client.get(f'/products/{product.id}/holders/count')
+
+    assert response.json() == {
+        'product_id': product.id,
+        'holders': 2,
+        'items': inventory.quantity + 5,
+    }
+
+
+def test_count_product_holders_should_return_not_found(client):
+    response = client.get('/products/999/holders/count')
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_export_products_should_not_block_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'EXPORT_CHUNK_SIZE', 1)
+    # A file database, so the export and the write use separate
+    # connections and SQLite's locks apply.
+    engine = create_async_engine(
+        f'sqlite+aiosqlite:///{tmp_path / "export.db"}',
+        connect_args={'timeout': 0.1},
+    )
+
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    async with AsyncSession(engine) as session:
+        session.add_all([
+            Product(
+                name=f'test-product-{index}',
+                brand='test-brand',
+                price=9.99,
+                type=ProductType.BOOKS,
+            )
+            for index in range(2)
+        ])
+        await session.commit()
+
+        response = await export_products(FilterExport(), session)
+        chunks = [await anext(response.body_iterator)]
+
+        session.add(
+            Product(
+                name='test-product-2',
+                brand='test-brand',
+                price=9.99,
+                type=ProductType.BOOKS,
+            )
+        )
+        await session.commit()
+
+        chunks += [chunk async for chunk in response.body_iterator]
+
+    await engine.dispose()
+
+    assert [json.loads(chunk)['name'] for chunk in chunks] == [
+        'test-product-0',
+        'test-product-1',
+        'test-product-2',
+    ]
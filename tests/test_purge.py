@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import func, select, update
+
+from fastapi_products_api.models.facets import ProductFacet
+from fastapi_products_api.models.product_user import ProductUser
+from fastapi_products_api.models.products import Product
+from fastapi_products_api.models.users import User
+from fastapi_products_api.purge import purge_deleted
+
+
+@pytest.mark.asyncio
+async def test_purge_deleted_should_remove_products_and_inventory(
+    session, product, inventory
+):
+    await session.execute(
+        update(Product)
+        .where(Product.id == product.id)
+        .values(deleted_at=func.now())
+    )
+    await session.commit()
+
+    purged = await purge_deleted(session, batch_size=1)
+
+    assert purged == {'inventory': 1, 'products': 1, 'users': 0}
+    assert await session.scalar(select(func.count(Product.id))) == 0
+    assert (
+        await session.scalar(select(func.count()).select_from(ProductUser))
+        == 0
+    )
+    assert set(
+        await session.scalars(
+            select(ProductFacet.count).where(ProductFacet.facet == 'type')
+        )
+    ) == {0}
+
+
+@pytest.mark.asyncio
+async def test_purge_deleted_should_keep_live_rows(
+    session, user, other_user, inventory
+):
+    await session.execute(
+        update(User)
+        .where(User.id == other_user.id)
+        .values(deleted_at=func.now())
+    )
+    await session.commit()
+
+    purged = await purge_deleted(session, batch_size=10)
+
+    assert purged == {'inventory': 0, 'products': 0, 'users': 1}
+    assert list(await session.scalars(select(User.id))) == [user.id]
+    assert (
+        await session.scalar(select(func.count()).select_from(ProductUser))
+        == 1
+    )
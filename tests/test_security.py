@@ -1,6 +1,24 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
 from jwt import decode
+from sqlalchemy import select, update
 
-from fastapi_products_api.security import create_access_token, settings
+from fastapi_products_api.models.users import User
+from fastapi_products_api.routers.users import delete_user, update_user
+from fastapi_products_api.schemas.users import UserUpdate
+from fastapi_products_api.security import (
+    Principal,
+    create_access_token,
+    create_user_access_token,
+    get_current_principal,
+    get_current_user,
+    get_current_writer,
+    principal_cache,
+    revoke_user_tokens,
+    settings,
+)
 
 
 def test_create_access_token_function():
@@ -11,3 +29,155 @@ def test_create_access_token_function():
 
     assert decoded['test'] == data['test']
     assert 'exp' in decoded
+
+
+def test_get_current_user_should_cache_principal(client, token, inventory):
+    for _ in range(2):
+        client.get(
+            '/inventory',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert principal_cache.hits == 1
+    assert principal_cache.misses == 1
+
+
+def test_update_user_should_invalidate_cached_principal(client, user, token):
+    client.get('/inventory', headers={'Authorization': f'Bearer {token}'})
+
+    client.patch(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'johndoe'},
+    )
+
+    assert len(principal_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_current_principal_stateless_should_trust_claims(
+    session, monkeypatch
+):
+    monkeypatch.setattr(settings, 'STATELESS_PRINCIPAL', True)
+    token = create_access_token({
+        'sub': 'ghost',
+        'uid': 42,
+        'su': False,
+        'ver': 0,
+    })
+
+    principal = await get_current_principal(session, token)
+
+    assert principal == Principal(
+        id=42, username='ghost', is_superuser=False, token_version=0
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_current_principal_stateless_should_reject_revoked_token(
+    session, monkeypatch
+):
+    monkeypatch.setattr(settings, 'STATELESS_PRINCIPAL', True)
+    token = create_access_token({
+        'sub': 'revoked',
+        'uid': 43,
+        'su': False,
+        'ver': 0,
+    })
+    revoke_user_tokens(43, 1)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_principal(session, token)
+
+    assert exc_info.value.status_code == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_get_current_writer_stateless_should_check_token_version(
+    session, user, monkeypatch
+):
+    monkeypatch.setattr(settings, 'STATELESS_PRINCIPAL', True)
+    token = create_user_access_token(user)
+
+    # Revoked by another worker: only the database knows about it.
+    user.token_version += 1
+    await session.commit()
+
+    assert (await get_current_principal(session, token)).id == user.id
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_writer(session, token)
+
+    assert exc_info.value.status_code == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_get_current_writer_stateless_should_accept_current_token(
+    session, user, monkeypatch
+):
+    monkeypatch.setattr(settings, 'STATELESS_PRINCIPAL', True)
+    token = create_user_access_token(user)
+
+    assert (await get_current_writer(session, token)).id == user.id
+
+
+def test_update_user_password_should_revoke_old_tokens(client, user, token):
+    client.patch(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'password': 'new-secret'},
+    )
+
+    response = client.delete(
+        f'/users/{user.id}', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+async def _cache_stale_principal(session, user, token):
+    # Cached at the current version, then revoked by another worker.
+    await get_current_user(session, token)
+    await session.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(token_version=User.token_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+    return await get_current_user(session, token)
+
+
+async def _token_version(session, user_id):
+    return await session.scalar(
+        select(User.token_version).where(User.id == user_id)
+    )
+
+
+@pytest.mark.asyncio
+async def test_update_user_password_should_bump_version_past_stale_cache(
+    session, user
+):
+    user_id = user.id
+    token = create_user_access_token(user)
+    current_user = await _cache_stale_principal(session, user, token)
+    revoked_version = await _token_version(session, user_id)
+
+    await update_user(
+        user_id, UserUpdate(password='new-secret'), current_user, session
+    )
+
+    assert await _token_version(session, user_id) == revoked_version + 1
+
+
+@pytest.mark.asyncio
+async def test_delete_user_should_bump_version_past_stale_cache(session, user):
+    user_id = user.id
+    token = create_user_access_token(user)
+    current_user = await _cache_stale_principal(session, user, token)
+    revoked_version = await _token_version(session, user_id)
+
+    await delete_user(user_id, current_user, session)
+
+    assert await _token_version(session, user_id) == revoked_version + 1
@@ -0,0 +1,43 @@
+import json
+from decimal import Decimal
+
+from fastapi_products_api.models.enums import ProductType
+from fastapi_products_api.schemas.products import (
+    ProductResponse,
+    ProductsResponse,
+)
+from fastapi_products_api.serialization import RowSerializer
+
+ROW = ('Book', 'Acme', Decimal('10.50'), ProductType.BOOKS, 1)
+
+
+def test_row_serializer_should_match_response_model_output():
+    serializer = RowSerializer(ProductResponse, key='products')
+
+    response = serializer.page([ROW], 'cursor')
+
+    expected = ProductsResponse(
+        products=[ProductResponse(**dict(zip(serializer.fields, ROW)))],
+        next_cursor='cursor',
+    )
+
+    assert response.media_type == 'application/json'
+    assert json.loads(response.body) == expected.model_dump(mode='json')
+
+
+def test_row_serializer_should_ignore_trailing_columns():
+    serializer = RowSerializer(ProductResponse)
+
+    response = serializer.item((*ROW, 'updated_at'), headers={'ETag': '"x"'})
+
+    assert json.loads(response.body)['id'] == 1
+    assert 'updated_at' not in json.loads(response.body)
+    assert response.headers['ETag'] == '"x"'
+
+
+def test_row_serializer_should_encode_sparse_fields():
+    serializer = RowSerializer(ProductResponse)
+
+    response = serializer.item(('Book', 1), ['name', 'id'])
+
+    assert json.loads(response.body) == {'name': 'Book', 'id': 1}
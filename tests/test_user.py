@@ -1,7 +1,14 @@
 from http import HTTPStatus
 
+from fastapi_products_api.hashing import password_hasher
 from fastapi_products_api.models.users import User
+from fastapi_products_api.routers.users import settings
 from fastapi_products_api.schemas.users import ResponseUser
+from fastapi_products_api.security import (
+    get_current_user,
+    get_password_hash,
+    principal_cache,
+)
 
 
 def test_create_user_should_return_created(client):
@@ -64,6 +71,74 @@ def test_create_user_should_return_conflict_user_username(client, other_user):
     assert response.status_code == HTTPStatus.CONFLICT
 
 
+def test_create_user_should_return_conflict_for_username_case_variant(
+    client, other_user
+):
+    response = client.post(
+        '/users',
+        json={
+            'username': 'Other-Test-User',
+            'email': 'test@mail.com',
+            'password': 'secret',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
+def test_create_user_should_return_conflict_for_email_case_variant(
+    client, other_user
+):
+    response = client.post(
+        '/users',
+        json={
+            'username': 'test',
+            'email': 'OTHER-TEST@mail.com',
+            'password': 'secret',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
+def test_create_user_should_reuse_username_of_deleted_user(
+    client, user, token
+):
+    client.delete(
+        f'/users/{user.id}', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    response = client.post(
+        '/users',
+        json={
+            'username': 'test-user',
+            'email': 'test@mail.com',
+            'password': 'secret',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+
+
+def test_create_user_should_reuse_case_variant_of_deleted_user(
+    client, user, token
+):
+    client.delete(
+        f'/users/{user.id}', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    response = client.post(
+        '/users',
+        json={
+            'username': 'Test-User',
+            'email': 'TEST@mail.com',
+            'password': 'secret',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+
+
 def test_read_user_should_return_ok(client, user):
     response = client.get(f'/users/{user.id}')
 
@@ -99,7 +174,7 @@ def test_read_users_should_return_ok(client):
 def test_read_users_should_return_empty_users_list(client):
     response = client.get('/users')
 
-    assert response.json() == {'users': []}
+    assert response.json() == {'users': [], 'next_cursor': None}
 
 
 def test_read_users_should_return_ResponseUserList(client, user):
@@ -107,7 +182,7 @@ def test_read_users_should_return_ResponseUserList(client, user):
 
     response = client.get('/users')
 
-    assert response.json() == {'users': [user_schema]}
+    assert response.json() == {'users': [user_schema], 'next_cursor': None}
 
 
 def test_update_user_should_return_ok(client, user, token):
@@ -124,6 +199,27 @@ def test_update_user_should_return_ok(client, user, token):
     assert response.status_code == HTTPStatus.OK
 
 
+def test_update_user_should_not_leave_stale_principal_cached(
+    client, session, user, token, monkeypatch
+):
+    async def hash_while_authenticating(password):
+        # Another request authenticates while the update is still hashing.
+        await get_current_user(session, token)
+
+        return get_password_hash(password)
+
+    monkeypatch.setattr(password_hasher, 'hash', hash_while_authenticating)
+
+    response = client.patch(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'johndoe', 'password': 'my-secret-pwd'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert principal_cache.get(token) is None
+
+
 def test_update_user_should_return_ResponseUser(client, user, token):
     response = client.patch(
         f'/users/{user.id}',
@@ -170,6 +266,18 @@ def test_update_user_should_conflict_username(client, user, other_user, token):
     assert response.status_code == HTTPStatus.CONFLICT
 
 
+def test_update_user_should_conflict_username_case_variant(
+    client, user, other_user, token
+):
+    response = client.patch(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'OTHER-TEST-USER'},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
 def test_update_user_should_conflict_email(client, user, other_user, token):
     response = client.patch(
         f'/users/{user.id}',
@@ -198,3 +306,221 @@ def test_delete_user_should_return_unauthorized(client, other_user, token):
     )
 
     assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_read_users_should_follow_next_cursor(client, user, other_user):
+    first_page = client.get('/users', params={'limit': 1}).json()
+    second_page = client.get(
+        '/users', params={'limit': 1, 'cursor': first_page['next_cursor']}
+    ).json()
+
+    assert first_page['users'][0]['id'] == user.id
+    assert second_page['users'][0]['id'] == other_user.id
+
+
+def test_read_users_should_return_requested_fields_only(client, user):
+    response = client.get('/users', params={'fields': 'username'})
+
+    assert response.json() == {
+        'users': [{'username': user.username}],
+        'next_cursor': None,
+    }
+
+
+def test_read_user_should_not_expose_password_field(client, user):
+    response = client.get(f'/users/{user.id}', params={'fields': 'password'})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_read_users_should_filter_by_username_prefix(client, user, other_user):
+    response = client.get(
+        '/users', params={'prefix': 'TEST', 'fields': 'username'}
+    )
+
+    assert response.json()['users'] == [{'username': user.username}]
+
+
+def test_read_users_should_filter_by_email_prefix(client, user, other_user):
+    response = client.get(
+        '/users',
+        params={'prefix': 'other', 'prefix_field': 'email', 'fields': 'id'},
+    )
+
+    assert response.json()['users'] == [{'id': other_user.id}]
+
+
+def test_read_users_should_page_prefix_matches_by_cursor(
+    client, user, other_user
+):
+    first = client.get(
+        '/users', params={'prefix': 'o', 'prefix_field': 'email', 'limit': 1}
+    ).json()
+    second = client.get(
+        '/users',
+        params={
+            'prefix': 'o',
+            'prefix_field': 'email',
+            'limit': 1,
+            'cursor': first['next_cursor'],
+        },
+    ).json()
+
+    assert [u['id'] for u in first['users']] == [other_user.id]
+    assert second['users'] == []
+
+
+def test_create_users_bulk_should_report_conflicts(client, user, token):
+    users = [
+        {'username': 'new-user', 'email': 'new@mail.com', 'password': 'a'},
+        {'username': user.username, 'email': 'x@mail.com', 'password': 'b'},
+        {'username': 'other', 'email': 'new@mail.com', 'password': 'c'},
+    ]
+
+    response = client.post(
+        '/users/bulk', json=users, headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['created'] == 1
+    assert [result['status'] for result in response.json()['results']] == [
+        'created',
+        'conflict',
+        'conflict',
+    ]
+
+
+def test_create_users_bulk_should_report_case_variant_conflicts(
+    client, user, token
+):
+    users = [
+        {'username': 'TEST-USER', 'email': 'a@mail.com', 'password': 'a'},
+        {'username': 'new-user', 'email': 'new@mail.com', 'password': 'b'},
+        {'username': 'New-User', 'email': 'c@mail.com', 'password': 'c'},
+        {'username': 'other', 'email': 'NEW@mail.com', 'password': 'd'},
+    ]
+
+    response = client.post(
+        '/users/bulk', json=users, headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert [result['status'] for result in response.json()['results']] == [
+        'conflict',
+        'created',
+        'conflict',
+        'conflict',
+    ]
+
+
+def test_create_users_bulk_should_hash_passwords(client, token):
+    client.post(
+        '/users/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[{'username': 'bulk', 'email': 'bulk@mail.com', 'password': 'a'}],
+    )
+
+    response = client.post(
+        '/auth/token', data={'username': 'bulk', 'password': 'a'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_create_users_bulk_should_reject_too_many_items(
+    client, token, monkeypatch
+):
+    monkeypatch.setattr(settings, 'USER_BULK_MAX_ITEMS', 0)
+
+    response = client.post(
+        '/users/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[{'username': 'a', 'email': 'a@mail.com', 'password': 'a'}],
+    )
+
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+def test_create_users_bulk_job_should_report_result(
+    client, token, monkeypatch
+):
+    monkeypatch.setattr(settings, 'USER_BULK_BATCH_SIZE', 1)
+
+    response = client.post(
+        '/users/bulk/jobs',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[
+            {'username': 'a', 'email': 'a@mail.com', 'password': 'a'},
+            {'username': 'b', 'email': 'b@mail.com', 'password': 'b'},
+        ],
+    )
+    job = client.get(
+        f'/users/bulk/jobs/{response.json()["id"]}',
+        headers={'Authorization': f'Bearer {token}'},
+    ).json()
+
+    assert response.status_code == HTTPStatus.ACCEPTED
+    assert job['status'] == 'completed'
+    assert job['total'] == len(job['result']['results'])
+    assert job['result']['created'] == job['total']
+
+
+def test_read_users_bulk_job_should_return_not_found(client, token):
+    response = client.get(
+        '/users/bulk/jobs/unknown',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Job not found'}
+
+
+def test_users_bulk_endpoints_should_require_authentication(client):
+    responses = [
+        client.post('/users/bulk', json=[]),
+        client.post('/users/bulk/jobs', json=[]),
+        client.get('/users/bulk/jobs/unknown'),
+    ]
+
+    assert [response.status_code for response in responses] == [
+        HTTPStatus.UNAUTHORIZED
+    ] * 3
+
+
+def test_users_bulk_endpoints_should_require_superuser(client, other_user):
+    token = client.post(
+        '/auth/token',
+        data={
+            'username': other_user.username,
+            'password': other_user.plain_password,
+        },
+    ).json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    responses = [
+        client.post('/users/bulk', json=[], headers=headers),
+        client.post('/users/bulk/jobs', json=[], headers=headers),
+        client.get('/users/bulk/jobs/unknown', headers=headers),
+    ]
+
+    assert [response.status_code for response in responses] == [
+        HTTPStatus.FORBIDDEN
+    ] * 3
+
+
+def test_delete_user_should_hide_user_and_block_login(client, user, token):
+    client.delete(
+        f'/users/{user.id}', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    login = client.post(
+        '/auth/token',
+        data={'username': user.username, 'password': user.plain_password},
+    )
+
+    assert client.get(f'/users/{user.id}').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    assert login.status_code == HTTPStatus.UNAUTHORIZED
+    assert client.get(
+        '/inventory', headers={'Authorization': f'Bearer {token}'}
+    ).status_code == (HTTPStatus.UNAUTHORIZED)